@@ -0,0 +1,106 @@
+"""
+Micro-benchmark for the server's socket I/O strategy.
+
+Serves a minimal keep-alive HTTP/1.1 response in a child process, once
+with the raw loop.sock_recv_into/sock_sendall calls httpy uses and once
+with asyncio.start_server streams, and reports requests per second from
+a few blocking client threads.
+"""
+
+import asyncio
+import multiprocessing
+import socket
+import threading
+import time
+
+REQUEST = b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n"
+RESPONSE = b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nhi"
+REQUESTS = 20000
+CONNECTIONS = 4
+
+
+async def serve_raw(port):
+    """Serve with raw socket calls on the event loop, as httpy does."""
+    loop = asyncio.get_running_loop()
+    server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    server_sock.bind(("127.0.0.1", port))
+    server_sock.listen(100)
+    server_sock.setblocking(False)
+
+    async def handle(client_sock):
+        buffer = memoryview(bytearray(8192))
+        while await loop.sock_recv_into(client_sock, buffer):
+            await loop.sock_sendall(client_sock, RESPONSE)
+        client_sock.close()
+
+    while True:
+        client_sock, _ = await loop.sock_accept(server_sock)
+        client_sock.setblocking(False)
+        loop.create_task(handle(client_sock))
+
+
+async def serve_streams(port):
+    """Serve with asyncio.start_server and StreamReader/StreamWriter."""
+    async def handle(reader, writer):
+        while True:
+            try:
+                await reader.readuntil(b"\r\n\r\n")
+            except asyncio.IncompleteReadError:
+                break
+            writer.write(RESPONSE)
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", port)
+    await server.serve_forever()
+
+
+def run_server(name, port):
+    asyncio.run(SERVERS[name](port))
+
+
+def run_clients(port):
+    """Send REQUESTS requests over CONNECTIONS keep-alive connections."""
+    def client():
+        sock = socket.create_connection(("127.0.0.1", port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        for _ in range(REQUESTS // CONNECTIONS):
+            sock.sendall(REQUEST)
+            received = b""
+            while not received.endswith(b"hi"):
+                received += sock.recv(4096)
+        sock.close()
+
+    threads = [threading.Thread(target=client) for _ in range(CONNECTIONS)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return REQUESTS / (time.perf_counter() - start)
+
+
+SERVERS = {
+    "sock_recv_into": serve_raw,
+    "start_server": serve_streams,
+}
+
+
+def main():
+    for name in SERVERS:
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        server = multiprocessing.Process(target=run_server, args=(name, port), daemon=True)
+        server.start()
+        time.sleep(0.5)
+        try:
+            print(f"{name:>16}: {run_clients(port):>8.0f} req/s")
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
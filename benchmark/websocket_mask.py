@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for WebSocket payload unmasking strategies.
+
+Compares the byte-at-a-time loop, a word-at-a-time (SWAR) loop using
+struct, the XOR_TABLE translate path with and without a pool of reused
+buffers, and the apply_mask() helper used by httpy.websocket, plus the NumPy path when NumPy is installed and the
+_wsmask C extension when it is built.
+"""
+
+import os
+import struct
+import sys
+import timeit
+
+# Add the parent directory to the path so we can import httpy
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+
+from httpy.websocket import (
+    apply_mask, NUMPY_AVAILABLE, WSMASK_AVAILABLE, XOR_TABLE, _apply_mask_numpy, _apply_mask_translate
+)
+
+SIZES = [2, 16, 125, 512, 4096, 65536, 1048576]
+
+
+def mask_scalar(data, mask):
+    """Unmask one byte at a time."""
+    unmasked = bytearray(len(data))
+    for i in range(len(data)):
+        unmasked[i] = data[i] ^ mask[i % 4]
+    return bytes(unmasked)
+
+
+def mask_swar(data, mask):
+    """Unmask eight bytes at a time with a uint64 XOR, then the tail byte by byte."""
+    length = len(data)
+    buf = bytearray(length)
+    mask_u64 = struct.unpack('<Q', mask * 2)[0]
+    words_end = length & ~7
+    for off in range(0, words_end, 8):
+        struct.pack_into('<Q', buf, off, struct.unpack_from('<Q', data, off)[0] ^ mask_u64)
+    for i in range(words_end, length):
+        buf[i] = data[i] ^ mask[i & 3]
+    return bytes(buf)
+
+
+BUFFER_POOL = {}
+
+
+def mask_translate_pooled(data, mask):
+    """
+    Unmask into a reused power-of-two sized buffer with XOR_TABLE.
+
+    The buffer goes straight back to the pool, standing in for a handler
+    that releases each message before receiving the next one.
+    """
+    length = len(data)
+    size = 1 << (length - 1).bit_length()
+    free = BUFFER_POOL.setdefault(size, [])
+    buf = free.pop() if free else bytearray(size)
+    buf[:length] = data
+    for i in range(4):
+        buf[i:length:4] = buf[i:length:4].translate(XOR_TABLE[mask[i]])
+    free.append(buf)
+    return memoryview(buf)[:length]
+
+
+STRATEGIES = [
+    ("scalar", mask_scalar),
+    ("swar", mask_swar),
+    ("translate", _apply_mask_translate),
+    ("pooled", mask_translate_pooled),
+    ("apply_mask", apply_mask),
+]
+
+if WSMASK_AVAILABLE:
+    from httpy._wsmask import apply_mask as apply_mask_c
+    STRATEGIES.append(("c", apply_mask_c))
+
+if NUMPY_AVAILABLE:
+    STRATEGIES.append(("numpy", lambda data, mask: _apply_mask_numpy(data, mask, len(data))))
+
+
+def main():
+    mask = os.urandom(4)
+    print(f"{'size':>10}" + "".join(f"{name:>14}" for name, _ in STRATEGIES))
+    for size in SIZES:
+        data = os.urandom(size)
+        expected = mask_scalar(data, mask)
+        number = max(1, 200000 // (size + 64))
+        row = f"{size:>10}"
+        for name, func in STRATEGIES:
+            assert func(data, mask) == expected, name
+            elapsed = min(timeit.repeat(lambda: func(data, mask), number=number, repeat=3))
+            row += f"{elapsed / number * 1e6:>12.1f}us"
+        print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Server usage examples for the HTTPy library.
 
 import asyncio
 import os
+import socket
 import ssl
 import sys
 import time
@@ -13,7 +14,7 @@ import time
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from httpy import (
-    Response, Request, get, post, put, delete, websocket, run,
+    Response, Request, get, post, put, delete, websocket, run, install_uvloop,
     HTTP_201_CREATED, HTTP_404_NOT_FOUND,
     WebSocketConnection, HTTP_400_BAD_REQUEST
 )
@@ -108,7 +109,7 @@ async def delete_user(req: Request) -> Response:
 @post("/echo")
 async def echo(req: Request) -> Response:
     """Echo back the request body."""
-    return Response.text(req.body)
+    return Response.text(req.text)
 
 
 # WebSocket examples
@@ -195,19 +196,28 @@ async def chat_room(ws: WebSocketConnection) -> None:
 
 
 if __name__ == "__main__":
+    # The HTTP port can be overridden, e.g. by the integration tests
+    port = int(os.environ.get("HTTPY_PORT", 8080))
+
+    # A parent process may instead hand over an already listening socket
+    http_sock = None
+    if "HTTPY_FD" in os.environ:
+        http_sock = socket.socket(fileno=int(os.environ["HTTPY_FD"]))
+        port = http_sock.getsockname()[1]
+
     print("Starting HTTPy Server Example")
     print("Press Ctrl+C to stop the server")
     print("Try these endpoints:")
-    print("  - http://localhost:8080/")
-    print("  - http://localhost:8080/hello/world")
-    print("  - http://localhost:8080/api/users")
-    print("  - http://localhost:8080/api/users/1")
-    print("  - POST to http://localhost:8080/api/users with JSON body")
-    print("  - PUT to http://localhost:8080/api/users/1 with JSON body")
-    print("  - DELETE to http://localhost:8080/api/users/1")
-    print("  - POST to http://localhost:8080/echo with any body")
-    print("  - WebSocket connection to ws://localhost:8080/ws")
-    print("  - WebSocket connection to ws://localhost:8080/ws/chat/room1")
+    print(f"  - http://localhost:{port}/")
+    print(f"  - http://localhost:{port}/hello/world")
+    print(f"  - http://localhost:{port}/api/users")
+    print(f"  - http://localhost:{port}/api/users/1")
+    print(f"  - POST to http://localhost:{port}/api/users with JSON body")
+    print(f"  - PUT to http://localhost:{port}/api/users/1 with JSON body")
+    print(f"  - DELETE to http://localhost:{port}/api/users/1")
+    print(f"  - POST to http://localhost:{port}/echo with any body")
+    print(f"  - WebSocket connection to ws://localhost:{port}/ws")
+    print(f"  - WebSocket connection to ws://localhost:{port}/ws/chat/room1")
 
     # Check if SSL certificates exist for HTTPS and HTTP/2.0
     ssl_context = None
@@ -248,7 +258,7 @@ if __name__ == "__main__":
                     pass
 
                 # Run HTTP, HTTPS, and HTTP/3 servers
-                http_server = asyncio.create_task(run(host="0.0.0.0", port=8080))
+                http_server = asyncio.create_task(run(host="0.0.0.0", port=port, sock=http_sock))
 
                 if http3_available:
                     # Run HTTPS with HTTP/3 support
@@ -270,12 +280,15 @@ if __name__ == "__main__":
                 await asyncio.gather(http_server, https_server)
             else:
                 # Run HTTP server only
-                await run(host="0.0.0.0", port=8080)
+                await run(host="0.0.0.0", port=port, sock=http_sock)
         except Exception as e:
             print(f"\nServer error: {e}")
 
 
     try:
+        # Use uvloop if it is installed (pip install -e .[uvloop])
+        install_uvloop()
+
         # Run the server
         asyncio.run(start_server())
     except KeyboardInterrupt:
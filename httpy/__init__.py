@@ -7,12 +7,13 @@ This library provides a clean and intuitive interface for creating HTTP servers.
 from .request import Request
 from .response import Response
 from .routing import Route, get, post, put, delete, route
-from .server import run
+from .server import run, install_uvloop
 from .status import (
     HTTP_200_OK, HTTP_201_CREATED, HTTP_204_NO_CONTENT,
     HTTP_400_BAD_REQUEST, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN,
-    HTTP_404_NOT_FOUND, HTTP_405_METHOD_NOT_ALLOWED,
-    HTTP_422_UNPROCESSABLE_ENTITY, HTTP_500_INTERNAL_SERVER_ERROR
+    HTTP_404_NOT_FOUND, HTTP_405_METHOD_NOT_ALLOWED, HTTP_413_CONTENT_TOO_LARGE,
+    HTTP_422_UNPROCESSABLE_ENTITY, HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE,
+    HTTP_500_INTERNAL_SERVER_ERROR, HTTP_501_NOT_IMPLEMENTED
 )
 from .websocket import (
     WebSocketConnection, WebSocketMessage, WebSocketOpCode, websocket
@@ -31,12 +32,13 @@ except ImportError:
 __all__ = [
     # Server
     'Request', 'Response', 'Route',
-    'get', 'post', 'put', 'delete', 'route', 'run',
+    'get', 'post', 'put', 'delete', 'route', 'run', 'install_uvloop',
     # HTTP Status Codes
     'HTTP_200_OK', 'HTTP_201_CREATED', 'HTTP_204_NO_CONTENT',
     'HTTP_400_BAD_REQUEST', 'HTTP_401_UNAUTHORIZED', 'HTTP_403_FORBIDDEN',
-    'HTTP_404_NOT_FOUND', 'HTTP_405_METHOD_NOT_ALLOWED',
-    'HTTP_422_UNPROCESSABLE_ENTITY', 'HTTP_500_INTERNAL_SERVER_ERROR',
+    'HTTP_404_NOT_FOUND', 'HTTP_405_METHOD_NOT_ALLOWED', 'HTTP_413_CONTENT_TOO_LARGE',
+    'HTTP_422_UNPROCESSABLE_ENTITY', 'HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE',
+    'HTTP_500_INTERNAL_SERVER_ERROR', 'HTTP_501_NOT_IMPLEMENTED',
     # WebSocket
     'WebSocketConnection', 'WebSocketMessage', 'WebSocketOpCode', 'websocket',
     # HTTP/1.1
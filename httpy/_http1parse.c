@@ -0,0 +1,229 @@
+/*
+ * C speedup for HTTP/1.1 request head parsing.
+ *
+ * Exposes parse_head(buffer, header_end, headers) -> (method, path, version),
+ * matching httpy.http1._parse_head for well-formed request lines. Lines are
+ * found with memchr instead of splitting a decoded string, and header names
+ * are lowercased and interned as httpy.headers.CIDict stores them. Request
+ * lines that need the regex fallback return None, before headers is touched.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+#include <string.h>
+
+static PyObject *version_11;
+static PyObject *version_10;
+
+/* Characters str.strip() removes from a latin-1 decoded string */
+static int
+is_space(unsigned char c)
+{
+    return (c >= 0x09 && c <= 0x0d) || (c >= 0x1c && c <= 0x20) ||
+           c == 0x85 || c == 0xa0;
+}
+
+/* str.lower() for a latin-1 character */
+static unsigned char
+to_lower(unsigned char c)
+{
+    if ((c >= 'A' && c <= 'Z') || (c >= 0xc0 && c <= 0xde && c != 0xd7)) {
+        return c + 0x20;
+    }
+    return c;
+}
+
+/* Decode a header name as latin-1, lowercased and interned */
+static PyObject *
+decode_name(const char *p, Py_ssize_t len)
+{
+    char stack[64];
+    char *lower = stack;
+    PyObject *name;
+    Py_ssize_t i;
+
+    if (len > (Py_ssize_t)sizeof(stack)) {
+        lower = PyMem_Malloc(len);
+        if (lower == NULL) {
+            return PyErr_NoMemory();
+        }
+    }
+    for (i = 0; i < len; i++) {
+        lower[i] = (char)to_lower((unsigned char)p[i]);
+    }
+    name = PyUnicode_DecodeLatin1(lower, len, NULL);
+    if (lower != stack) {
+        PyMem_Free(lower);
+    }
+    if (name != NULL) {
+        PyUnicode_InternInPlace(&name);
+    }
+    return name;
+}
+
+/* Return the start of the first CRLF in [p, end), or end */
+static const char *
+find_crlf(const char *p, const char *end)
+{
+    while (p < end) {
+        const char *cr = memchr(p, '\r', end - p);
+        if (cr == NULL || cr + 1 >= end) {
+            return end;
+        }
+        if (cr[1] == '\n') {
+            return cr;
+        }
+        p = cr + 1;
+    }
+    return end;
+}
+
+static int
+parse_header_line(const char *p, const char *end, PyObject *headers)
+{
+    const char *colon = memchr(p, ':', end - p);
+    const char *v;
+    PyObject *key, *value;
+    int rc;
+
+    if (colon == NULL || colon == p) {
+        return 0;
+    }
+    v = colon + 1;
+    if (memchr(v, '\r', end - v) != NULL || memchr(v, '\n', end - v) != NULL) {
+        PyErr_SetString(PyExc_ValueError,
+                        "Newline or carriage return character detected in HTTP "
+                        "status message or header. This is a potential security issue.");
+        return -1;
+    }
+    while (v < end && is_space((unsigned char)*v)) {
+        v++;
+    }
+    while (end > v && is_space((unsigned char)end[-1])) {
+        end--;
+    }
+
+    key = decode_name(p, colon - p);
+    if (key == NULL) {
+        return -1;
+    }
+    value = PyUnicode_DecodeLatin1(v, end - v, NULL);
+    if (value == NULL) {
+        Py_DECREF(key);
+        return -1;
+    }
+    rc = PyDict_SetItem(headers, key, value);
+    Py_DECREF(key);
+    Py_DECREF(value);
+    return rc;
+}
+
+static PyObject *
+http1parse_parse_head(PyObject *self, PyObject *args)
+{
+    Py_buffer buffer;
+    Py_ssize_t header_end;
+    PyObject *headers, *method = NULL, *path = NULL, *version, *result = NULL;
+    const char *start, *end, *line_end, *sp1, *sp2, *p;
+
+    if (!PyArg_ParseTuple(args, "y*nO!:parse_head", &buffer, &header_end,
+                          &PyDict_Type, &headers)) {
+        return NULL;
+    }
+    if (header_end < 0 || header_end > buffer.len) {
+        PyErr_SetString(PyExc_ValueError, "header_end out of range");
+        goto done;
+    }
+
+    start = (const char *)buffer.buf;
+    end = start + header_end;
+    line_end = find_crlf(start, end);
+
+    /* Request line: METHOD SP path SP HTTP/1.x with exactly two spaces */
+    sp1 = memchr(start, ' ', line_end - start);
+    if (sp1 == NULL) {
+        goto fallback;
+    }
+    sp2 = memchr(sp1 + 1, ' ', line_end - sp1 - 1);
+    if (sp2 == NULL || sp2 == sp1 + 1 ||
+        memchr(sp2 + 1, ' ', line_end - sp2 - 1) != NULL) {
+        goto fallback;
+    }
+    if (sp1 == start) {
+        goto fallback;
+    }
+    for (p = start; p < sp1; p++) {
+        if (*p < 'A' || *p > 'Z') {
+            goto fallback;
+        }
+    }
+    if (line_end - sp2 - 1 != 8 || memcmp(sp2 + 1, "HTTP/1.", 7) != 0) {
+        goto fallback;
+    }
+    if (sp2[8] == '1') {
+        version = version_11;
+    }
+    else if (sp2[8] == '0') {
+        version = version_10;
+    }
+    else {
+        goto fallback;
+    }
+
+    /* Header lines */
+    for (p = line_end; p < end; ) {
+        const char *next;
+        p += 2;
+        next = find_crlf(p, end);
+        if (parse_header_line(p, next, headers) < 0) {
+            goto done;
+        }
+        p = next;
+    }
+
+    method = PyUnicode_DecodeLatin1(start, sp1 - start, NULL);
+    if (method == NULL) {
+        goto done;
+    }
+    path = PyUnicode_DecodeLatin1(sp1 + 1, sp2 - sp1 - 1, NULL);
+    if (path == NULL) {
+        goto done;
+    }
+    result = PyTuple_Pack(3, method, path, version);
+    goto done;
+
+fallback:
+    result = Py_None;
+    Py_INCREF(result);
+
+done:
+    Py_XDECREF(method);
+    Py_XDECREF(path);
+    PyBuffer_Release(&buffer);
+    return result;
+}
+
+static PyMethodDef http1parse_methods[] = {
+    {"parse_head", http1parse_parse_head, METH_VARARGS,
+     "Parse an HTTP/1.x request line and headers into a CIDict."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef http1parse_module = {
+    PyModuleDef_HEAD_INIT,
+    "_http1parse",
+    "C speedup for HTTP/1.1 request head parsing.",
+    -1,
+    http1parse_methods
+};
+
+PyMODINIT_FUNC
+PyInit__http1parse(void)
+{
+    version_11 = PyUnicode_InternFromString("1.1");
+    version_10 = PyUnicode_InternFromString("1.0");
+    if (version_11 == NULL || version_10 == NULL) {
+        return NULL;
+    }
+    return PyModule_Create(&http1parse_module);
+}
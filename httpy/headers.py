@@ -0,0 +1,102 @@
+"""
+HTTP header collection for HTTPy.
+
+This module provides the case-insensitive dict used for request headers.
+"""
+
+import sys
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+# Lowercased, interned forms of header names seen so far, keyed by the name as
+# received, so normalizing a known name is a single dict probe
+_NAME_CACHE: Dict[str, str] = {}
+
+# Upper bound for _NAME_CACHE, so clients sending random names can't grow it
+NAME_CACHE_SIZE = 1024
+
+def header_name(name: str) -> str:
+    """
+    Normalize a header name to its lowercase, interned form.
+
+    Args:
+        name: The header name in any case
+
+    Returns:
+        The lowercased name, interned so dict lookups compare by identity
+    """
+    normalized = _NAME_CACHE.get(name)
+    if normalized is None:
+        normalized = sys.intern(name.lower())
+        if len(_NAME_CACHE) < NAME_CACHE_SIZE:
+            _NAME_CACHE[name] = normalized
+    return normalized
+
+# Pre-intern the names looked up on every request
+for _name in ("Host", "Content-Length", "Content-Type", "Connection", "Keep-Alive",
+              "User-Agent", "Upgrade", "Accept", "Accept-Encoding", "Sec-WebSocket-Key",
+              "Sec-WebSocket-Version", "HTTP2-Settings"):
+    header_name(_name)
+    header_name(_name.lower())
+del _name
+
+
+class CIDict(dict):
+    """
+    A dict of headers whose names are case-insensitive.
+
+    Names are stored lowercased, so "Content-Type" and "content-type" are the
+    same key and iteration yields lowercase names. Equality with a plain
+    mapping also ignores the case of its keys.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, data: Union[Mapping[str, Any], Iterable[Tuple[str, Any]], None] = None, **kwargs: Any):
+        super().__init__()
+        self.update(data, **kwargs)
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        super().__setitem__(header_name(name), value)
+
+    def __getitem__(self, name: str) -> Any:
+        return super().__getitem__(header_name(name))
+
+    def __delitem__(self, name: str) -> None:
+        super().__delitem__(header_name(name))
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and super().__contains__(header_name(name))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, CIDict):
+            return dict.__eq__(self, other)
+        if isinstance(other, Mapping):
+            return dict.__eq__(self, CIDict(other))
+        return NotImplemented
+
+    def __ne__(self, other: object) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    def get(self, name: str, default: Optional[Any] = None) -> Any:
+        return super().get(header_name(name), default)
+
+    def pop(self, name: str, *default: Any) -> Any:
+        return super().pop(header_name(name), *default)
+
+    def setdefault(self, name: str, default: Optional[Any] = None) -> Any:
+        return super().setdefault(header_name(name), default)
+
+    def update(self, data: Union[Mapping[str, Any], Iterable[Tuple[str, Any]], None] = None, **kwargs: Any) -> None:
+        if data is not None:
+            items = data.items() if isinstance(data, Mapping) else data
+            for name, value in items:
+                self[name] = value
+        for name, value in kwargs.items():
+            self[name] = value
+
+    def copy(self) -> 'CIDict':
+        return CIDict(self)
+
+    def __repr__(self) -> str:
+        return f"CIDict({dict.__repr__(self)})"
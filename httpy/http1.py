@@ -5,31 +5,318 @@ This module provides HTTP/1.1 support for the HTTP server.
 """
 
 import asyncio
+import os
 import re
-import io
-from urllib.parse import parse_qs
-from typing import Dict, Any, Optional, Tuple, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 
-from .request import Request
+from .headers import CIDict, header_name
+from .request import Request, parse_query_string
 from .response import Response
-from .routing import ROUTES
+from .routing import find_route
 from .status import (
+    HTTP_STATUS_CODES,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
-    HTTP_500_INTERNAL_SERVER_ERROR
+    HTTP_413_CONTENT_TOO_LARGE,
+    HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE,
+    HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_501_NOT_IMPLEMENTED
 )
 
 # Precompile regex patterns for better performance
-HEADER_PATTERN = re.compile(r'([^:]+):\s*(.*)')
-REQUEST_LINE_PATTERN = re.compile(r'([A-Z]+)\s+([^ ]+)\s+HTTP/\d\.\d')
+REQUEST_LINE_PATTERN = re.compile(r'([A-Z]+)\s+([^ ]+)\s+HTTP/(\d\.\d)')
 
-# Buffer size for socket operations - larger buffer for better performance
-BUFFER_SIZE = 8192
+# Content-Length header values in a raw request head, to find repeated headers
+# that the parsed headers collapse to their last value
+CONTENT_LENGTH_PATTERN = re.compile(rb'\r\ncontent-length:([^\r\n]*)', re.IGNORECASE)
+
+# Protocol versions of well-formed request lines, parsed without the regex
+HTTP_VERSIONS = {"HTTP/1.1": "1.1", "HTTP/1.0": "1.0"}
+
+# The C parser is optional; it is built by setup.py when a compiler is available
+try:
+    from ._http1parse import parse_head as _parse_head_c
+    HTTP1PARSE_AVAILABLE = True
+except ImportError:
+    HTTP1PARSE_AVAILABLE = False
+
+# Buffer size for socket operations. 16 KiB holds a typical request head and
+# small body, and stays well below glibc's 128 KiB mmap threshold so buffers
+# come from the heap; larger requests grow the buffer on demand
+BUFFER_SIZE = 16 * 1024
+
+# Largest receive buffer a connection keeps between requests after growing it
+MAX_RETAINED_BUFFER_SIZE = 65536
+
+# Largest request head (request line and headers) accepted, answered with 431
+MAX_HEAD_SIZE = 65536
+
+# Largest request body accepted, answered with 413 before any of it is read
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+# Number of idle receive buffers and Request objects kept for new connections
+CONNECTION_POOL_SIZE = 64
+
+# Upper bound for responses coalesced into a single send for pipelined requests
+WRITE_COALESCE_SIZE = 65536
+
+# Keep-alive decisions by Connection header value for HTTP/1.1 and HTTP/1.0
+# requests, so the common values cost one dict probe instead of tokenizing
+_KEEP_ALIVE_CACHE: Dict[Tuple[str, str], bool] = {
+    ("1.1", ""): True, ("1.1", "keep-alive"): True, ("1.1", "close"): False,
+    ("1.0", ""): False, ("1.0", "keep-alive"): True, ("1.0", "close"): False,
+}
+
+# Upper bound for _KEEP_ALIVE_CACHE, so clients sending random values can't grow it
+KEEP_ALIVE_CACHE_SIZE = 256
+
+def _keep_alive(http_version: str, connection: str) -> bool:
+    """
+    Decide whether a connection stays open after a request (RFC 7230 section 6.3).
+
+    The Connection header is a comma-separated list of case-insensitive
+    tokens. HTTP/1.1 connections stay open unless it has "close"; HTTP/1.0
+    connections close unless it has "keep-alive".
+
+    Args:
+        http_version: The request's HTTP version, "1.1" or "1.0"
+        connection: The Connection header value, or "" if absent
+
+    Returns:
+        True if the connection should be kept alive
+    """
+    key = (http_version, connection)
+    keep_alive = _KEEP_ALIVE_CACHE.get(key)
+    if keep_alive is None:
+        tokens = frozenset(token.strip() for token in connection.lower().split(","))
+        if "close" in tokens:
+            keep_alive = False
+        else:
+            keep_alive = http_version == "1.1" or "keep-alive" in tokens
+        if len(_KEEP_ALIVE_CACHE) < KEEP_ALIVE_CACHE_SIZE:
+            _KEEP_ALIVE_CACHE[key] = keep_alive
+    return keep_alive
+
+class RequestError(Exception):
+    """Raised when a request is refused before it reaches a handler."""
+
+    def __init__(self, status: int):
+        """
+        Initialize the error.
+
+        Args:
+            status: The status code to answer with
+        """
+        super().__init__(HTTP_STATUS_CODES[status])
+        self.status = status
+
+class RequestTooLarge(RequestError):
+    """Raised when a request head or body is over MAX_HEAD_SIZE or MAX_BODY_SIZE."""
+
+def _grow_buffer(buffer_view: memoryview, buffer_len: int, size: int) -> Tuple[bytearray, memoryview]:
+    """
+    Copy the filled part of a buffer into a new, larger buffer.
+
+    Args:
+        buffer_view: A view of the current buffer
+        buffer_len: The number of bytes filled in the current buffer
+        size: The size of the new buffer
+
+    Returns:
+        A tuple of (buffer, buffer_view) for the new buffer
+    """
+    buffer = bytearray(size)
+    buffer[:buffer_len] = buffer_view[:buffer_len]
+    return buffer, memoryview(buffer)
+
+class ConnectionBuffer:
+    """
+    A receive buffer kept for the lifetime of a connection.
+
+    Each request on the connection is read into the same bytearray, so a
+    kept-alive connection doesn't allocate and zero a new buffer per request.
+    The buffer grows when a request doesn't fit and is only kept at up to
+    MAX_RETAINED_BUFFER_SIZE bytes between requests.
+    """
+
+    __slots__ = ("data", "view")
+
+    def __init__(self, size: int = BUFFER_SIZE):
+        self.data = bytearray(size)
+        self.view = memoryview(self.data)  # Use memoryview for zero-copy operations
+
+    def grow(self, used: int, size: int) -> None:
+        """
+        Replace the buffer with a larger one, keeping the first used bytes.
+
+        Args:
+            used: The number of bytes filled in the current buffer
+            size: The size of the new buffer
+        """
+        self.data, self.view = _grow_buffer(self.view, used, size)
+
+    def release(self) -> None:
+        """Drop a buffer that grew past MAX_RETAINED_BUFFER_SIZE."""
+        if len(self.data) > MAX_RETAINED_BUFFER_SIZE:
+            self.data = bytearray(BUFFER_SIZE)
+            self.view = memoryview(self.data)
+
+# Receive buffers and Request objects released by closed connections, reused
+# by new ones so short-lived connections skip allocating them
+_BUFFER_POOL: List[ConnectionBuffer] = []
+_REQUEST_POOL: List[Request] = []
+
+def acquire_buffer() -> ConnectionBuffer:
+    """
+    Get a receive buffer for a new connection, reusing a pooled one if possible.
+
+    Returns:
+        A ConnectionBuffer of at least BUFFER_SIZE bytes
+    """
+    return _BUFFER_POOL.pop() if _BUFFER_POOL else ConnectionBuffer()
+
+def release_buffer(conn_buffer: ConnectionBuffer) -> None:
+    """
+    Return the receive buffer of a finished connection to the pool.
+
+    Args:
+        conn_buffer: The buffer, which the caller must not use afterwards
+    """
+    if len(_BUFFER_POOL) < CONNECTION_POOL_SIZE:
+        _BUFFER_POOL.append(conn_buffer)
+
+def _skip_empty_lines(pending: bytearray) -> None:
+    """
+    Drop the empty lines a client may send before a request line.
+
+    RFC 7230 section 3.5 asks servers to ignore at least one CRLF before a
+    request, which some clients send after a request body.
+
+    Args:
+        pending: The buffered bytes of the next request, modified in place
+    """
+    start = 0
+    while pending.startswith(b"\r\n", start):
+        start += 2
+    if start:
+        del pending[:start]
+
+def _content_length(buffer: bytearray, header_end: int, headers: CIDict) -> int:
+    """
+    Get the body length of a request from its framing headers.
+
+    Malformed and oversized lengths are refused here, before anything is
+    sized from the client's value. Only Content-Length framing is supported. Without chunked decoding, the
+    bytes of a Transfer-Encoding body would be parsed as further pipelined
+    requests, so such requests are refused, as are Content-Length values
+    that are ambiguous (RFC 7230 section 3.3.3).
+
+    Args:
+        buffer: The buffer holding the request
+        header_end: The offset of the blank line ending the headers
+        headers: The parsed request headers
+
+    Returns:
+        The body length, 0 if the request has no Content-Length
+
+    Raises:
+        RequestError: 501 for a Transfer-Encoding, 400 for a Transfer-Encoding
+            together with a Content-Length, Content-Length headers that
+            disagree, or a value that is not a plain decimal number
+        RequestTooLarge: If the length is over MAX_BODY_SIZE
+    """
+    if "Transfer-Encoding" in headers:
+        if "Content-Length" in headers:
+            raise RequestError(HTTP_400_BAD_REQUEST)
+        raise RequestError(HTTP_501_NOT_IMPLEMENTED)
+
+    content_length = headers.get("Content-Length")
+    if content_length is None:
+        return 0
+
+    # int() would also take "-1", "+5", "1_0" and non-ASCII digits; a negative
+    # length would move the body end back into the head, which then parses as
+    # another request
+    if not (content_length.isascii() and content_length.isdigit()):
+        raise RequestError(HTTP_400_BAD_REQUEST)
+
+    # Repeated headers are only allowed when they agree
+    values = CONTENT_LENGTH_PATTERN.findall(buffer, 0, header_end)
+    if len(values) > 1 and len({value.strip() for value in values}) > 1:
+        raise RequestError(HTTP_400_BAD_REQUEST)
+
+    content_length = int(content_length)
+    if content_length > MAX_BODY_SIZE:
+        raise RequestTooLarge(HTTP_413_CONTENT_TOO_LARGE)
+    return content_length
+
+def _parse_head(buffer: bytearray, header_end: int, headers: CIDict) -> Tuple[str, str, str]:
+    """
+    Parse the request line and headers of a request head.
+
+    The _http1parse C extension does the same for well-formed request lines
+    when it is built; this is the fallback and the reference behaviour.
+
+    Args:
+        buffer: The buffer holding the request
+        header_end: The offset of the blank line ending the headers
+        headers: The CIDict the headers are added to, under lowercase names
+
+    Returns:
+        A tuple of (method, path, http_version)
+
+    Raises:
+        ValueError: If the request line is invalid or a header value contains
+            a newline or carriage return
+    """
+    header_data = buffer[:header_end].decode('latin1')  # Use latin1 for better performance
+    header_lines = header_data.split("\r\n")
+
+    # Parse request line, splitting on single spaces in the common case and
+    # falling back to the regex for anything unusual
+    request_line = header_lines[0]
+    parts = request_line.split(" ")
+    http_version = HTTP_VERSIONS.get(parts[-1]) if len(parts) == 3 else None
+    if http_version is not None and parts[1] and parts[0].isascii() and parts[0].isalpha() and parts[0].isupper():
+        method, path = parts[0], parts[1]
+    else:
+        match = REQUEST_LINE_PATTERN.match(request_line)
+        if not match:
+            raise ValueError(f"Invalid request line: {request_line}")
+        method, path, http_version = match.groups()
+
+    # When every CR and LF belongs to a line separator no value can contain
+    # one, so the headers are added in a single dict.update
+    separators = len(header_lines) - 1
+    if header_data.count("\r") == separators and header_data.count("\n") == separators:
+        dict.update(headers, [
+            (header_name(key), value.strip())
+            for key, sep, value in [line.partition(":") for line in header_lines[1:]]
+            if sep and key
+        ])
+        return method, path, http_version
+
+    for line in header_lines[1:]:
+        # A single partition replaces a regex match per header line
+        key, sep, value = line.partition(":")
+        if not sep or not key:
+            continue
+        # Validate header value - reject if it contains newlines or carriage returns
+        if '\r' in value or '\n' in value:
+            raise ValueError("Newline or carriage return character detected in HTTP status message or header. This is a potential security issue.")
+        headers[key] = value.strip()
+
+    return method, path, http_version
 
 async def handle_http1_request(
     loop: asyncio.AbstractEventLoop,
     client_sock: asyncio.StreamWriter,
     reader: asyncio.StreamReader,
-    writer: asyncio.StreamWriter
+    writer: asyncio.StreamWriter,
+    pending: Optional[bytearray] = None,
+    req: Optional[Request] = None,
+    conn_buffer: Optional[ConnectionBuffer] = None,
+    buffered: int = 0
 ) -> Tuple[bool, Optional[Request]]:
     """
     Handle an HTTP/1.1 request.
@@ -39,158 +326,197 @@ async def handle_http1_request(
         client_sock: The client socket
         reader: The stream reader
         writer: The stream writer
+        pending: Optional connection buffer holding bytes received after the
+            previous request (HTTP pipelining). It is consumed before reading
+            from the socket, and refilled with any bytes past this request.
+        req: Optional request object from the previous request on this
+            connection. It is reset in place, with its dictionaries cleared,
+            instead of allocating a new Request.
+        conn_buffer: Optional receive buffer of the connection, reused
+            instead of allocating a buffer for this request.
+        buffered: Number of bytes of this request already read into the
+            start of conn_buffer, e.g. by a caller that peeked at the
+            connection. pending must be empty when this is set.
 
     Returns:
         A tuple of (keep_alive, request) where keep_alive is a boolean indicating
         whether the connection should be kept alive, and request is the parsed
         HTTP request or None if the connection should be closed.
-    """
-    buffer = bytearray(BUFFER_SIZE)  # Preallocate buffer for better performance
-    buffer_view = memoryview(buffer)  # Use memoryview for zero-copy operations
-    buffer_len = 0
-
-    # Use a preallocated buffer for better performance
-    n = await loop.sock_recv_into(client_sock, buffer_view[buffer_len:])
-    if not n:
-        return False, None
 
-    buffer_len += n
-    data = buffer_view[:buffer_len]
-
-    # Find the header/body separator
-    header_end = data.obj.find(b"\r\n\r\n", 0, buffer_len)
-    if header_end == -1:
-        # If buffer is full but no header end found, expand the buffer
+    Raises:
+        RequestError: If the body framing headers are unsupported or invalid
+        RequestTooLarge: If the head is over MAX_HEAD_SIZE or the declared
+            body over MAX_BODY_SIZE
+    """
+    if pending:
+        _skip_empty_lines(pending)
+    pending_len = len(pending) if pending else 0
+    if conn_buffer is None:
+        conn_buffer = ConnectionBuffer(BUFFER_SIZE + pending_len)
+    elif len(conn_buffer.data) < BUFFER_SIZE + pending_len:
+        conn_buffer.grow(0, BUFFER_SIZE + pending_len)
+    buffer = conn_buffer.data
+    buffer_view = conn_buffer.view
+    buffer_len = buffered
+
+    if pending_len:
+        # Start from the bytes a pipelining client already sent
+        buffer[:pending_len] = pending
+        buffer_len = pending_len
+        pending.clear()
+
+    # Read until the buffer holds a complete header block, doubling the
+    # buffer when a large header block fills it
+    header_end = buffer.find(b"\r\n\r\n", 0, buffer_len)
+    while header_end == -1:
+        if buffer_len >= MAX_HEAD_SIZE:
+            raise RequestTooLarge(HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE)
         if buffer_len == len(buffer):
-            new_buffer = bytearray(len(buffer) * 2)
-            new_buffer[:buffer_len] = buffer[:buffer_len]
-            buffer = new_buffer
-            buffer_view = memoryview(buffer)
-        return False, None
-
-    # Parse headers more efficiently
-    header_data = bytes(data[:header_end]).decode('latin1')  # Use latin1 for better performance
-    header_lines = header_data.split("\r\n")
-
-    # Parse request line
-    request_line = header_lines[0]
-    match = REQUEST_LINE_PATTERN.match(request_line)
-    if not match:
-        raise ValueError(f"Invalid request line: {request_line}")
-
-    method, path = match.groups()
-
-    # Parse headers more efficiently
-    headers = {}
-    for line in header_lines[1:]:
-        if not line:
-            continue
-        match = HEADER_PATTERN.match(line)
-        if match:
-            key, value = match.groups()
-            # Validate header value - reject if it contains newlines or carriage returns
-            if '\r' in value or '\n' in value:
-                raise ValueError("Newline or carriage return character detected in HTTP status message or header. This is a potential security issue.")
-            headers[key] = value
-
-    # Get content length and prepare to read body
-    content_length = int(headers.get("Content-Length", "0"))
+            conn_buffer.grow(buffer_len, min(len(buffer) * 2, MAX_HEAD_SIZE))
+            buffer, buffer_view = conn_buffer.data, conn_buffer.view
+        n = await loop.sock_recv_into(client_sock, buffer_view[buffer_len:])
+        if not n:
+            return False, None
+        # Search from just before the new bytes in case the separator straddles reads
+        search_start = max(0, buffer_len - 3)
+        buffer_len += n
+        header_end = buffer.find(b"\r\n\r\n", search_start, buffer_len)
+
+    # Parse headers more efficiently, reusing the recycled request's dict
+    if req is not None:
+        headers = req.headers
+        headers.clear()
+    else:
+        headers = CIDict()
+    parsed = _parse_head_c(buffer, header_end, headers) if HTTP1PARSE_AVAILABLE else None
+    if parsed is None:
+        parsed = _parse_head(buffer, header_end, headers)
+    method, path, http_version = parsed
+
+    # Get content length and prepare to read body; invalid and oversized
+    # lengths are refused before the buffer is sized from them
+    content_length = _content_length(buffer, header_end, headers)
     body_start = header_end + 4  # Skip \r\n\r\n
 
     # Check if we need to read more data for the body
     body_end = body_start + content_length
 
-    # For POST and PUT requests, ensure we read the full body
-    if method in ["POST", "PUT"] and content_length > 0:
-        # If we don't have the full body yet, read more data
-        remaining_bytes = max(0, body_end - buffer_len)
-
-        # If buffer is too small, expand it
+    if body_end > buffer_len:
+        # Size the buffer for the whole body up front so it is read straight
+        # into place without further reallocation
         if body_end > len(buffer):
-            new_buffer = bytearray(body_end)
-            new_buffer[:buffer_len] = buffer[:buffer_len]
-            buffer = new_buffer
-            buffer_view = memoryview(buffer)
+            conn_buffer.grow(buffer_len, body_end)
+            buffer, buffer_view = conn_buffer.data, conn_buffer.view
 
-        # Read remaining bytes with timeout
         try:
-            # Set a reasonable timeout for reading the body
-            while remaining_bytes > 0:
-                # Ensure we don't try to read beyond the buffer size
-                read_size = min(remaining_bytes, len(buffer_view) - buffer_len)
-                if read_size <= 0:
-                    # Buffer is full but we need more data, expand the buffer
-                    new_size = max(len(buffer) * 2, buffer_len + remaining_bytes)
-                    new_buffer = bytearray(new_size)
-                    new_buffer[:buffer_len] = buffer[:buffer_len]
-                    buffer = new_buffer
-                    buffer_view = memoryview(buffer)
-                    read_size = min(remaining_bytes, len(buffer_view) - buffer_len)
-
+            while buffer_len < body_end:
                 n = await asyncio.wait_for(
-                    loop.sock_recv_into(client_sock, buffer_view[buffer_len:buffer_len + read_size]),
+                    loop.sock_recv_into(client_sock, buffer_view[buffer_len:body_end]),
                     timeout=5.0  # 5 second timeout
                 )
                 if not n:
                     break  # Connection closed
-
                 buffer_len += n
-                remaining_bytes -= n
         except asyncio.TimeoutError:
             # If timeout occurs, use what we have so far
             pass
-    else:
-        # For other methods, just read what's available
-        while buffer_len < body_end:
-            try:
-                n = await loop.sock_recv_into(client_sock, buffer_view[buffer_len:])
-                if not n:
-                    break
-                buffer_len += n
-            except Exception:
-                break
 
     # Extract body (ensure we don't go beyond buffer_len)
     actual_body_end = min(body_end, buffer_len)
     body = bytes(buffer_view[body_start:actual_body_end])
 
-    # Check if connection should be kept alive
-    # In HTTP/1.1, connections are keep-alive by default unless explicitly closed
-    conn_header = headers.get("Connection", "").lower()
-    http_version = request_line.split(" ")[2] if len(request_line.split(" ")) > 2 else "HTTP/1.0"
+    # Keep bytes that belong to the next pipelined request for the next call
+    if pending is not None and buffer_len > body_end:
+        pending += buffer_view[body_end:buffer_len]
+        _skip_empty_lines(pending)
+    conn_buffer.release()
 
-    if http_version.startswith("HTTP/1.1"):
-        # HTTP/1.1: Keep-alive by default unless explicitly closed
-        keep_alive = conn_header != "close"
-    else:
-        # HTTP/1.0: Close by default unless explicitly kept alive
-        keep_alive = conn_header == "keep-alive"
+    # Check if connection should be kept alive; the connection loop only
+    # reads the returned flag
+    keep_alive = _keep_alive(http_version, headers.get("Connection", ""))
 
     # Parse query parameters if present
     query_params = {}
     if '?' in path:
         path, query_string = path.split('?', 1)
-        query_params = parse_qs(query_string)
-        # Convert lists to single values for simple cases
-        for key, value in query_params.items():
-            if len(value) == 1:
-                query_params[key] = value[0]
-
-    # Create request object - pass raw bytes for POST/PUT methods to handle binary data correctly
-    if method in ["POST", "PUT"]:
-        req = Request(method, path, headers, body, {}, query_params)
+        query_params = parse_query_string(query_string)
+
+    # The body is passed on as raw bytes; Request.text decodes it on demand
+    if req is not None:
+        path_params = req.path_params
+        path_params.clear()
+        req.reset(method, path, headers, body, path_params, query_params)
     else:
-        # For other methods, decode to string for backward compatibility
-        req = Request(method, path, headers, body.decode('utf-8', errors='replace'), {}, query_params)
+        req = Request(method, path, headers, body, {}, query_params)
 
     return keep_alive, req
 
-async def handle_http1_connection(
+async def _sock_sendmsg(
     loop: asyncio.AbstractEventLoop,
     client_sock: asyncio.StreamWriter,
-    reader: asyncio.StreamReader,
-    writer: asyncio.StreamWriter
+    buffers: List[bytes]
 ) -> None:
+    """
+    Send several buffers with one gathering write, without joining them.
+
+    A single sendmsg call is tried first; whatever it could not send is
+    finished with sock_sendall. Platforms without sendmsg use sock_sendall
+    for every buffer.
+
+    Args:
+        loop: The event loop
+        client_sock: The client socket
+        buffers: The buffers to send, in order
+    """
+    sent = 0
+    if hasattr(client_sock, "sendmsg"):
+        try:
+            sent = client_sock.sendmsg(buffers)
+        except (BlockingIOError, InterruptedError):
+            pass
+    for buffer in buffers:
+        size = len(buffer)
+        if sent >= size:
+            sent -= size
+            continue
+        await loop.sock_sendall(client_sock, memoryview(buffer)[sent:])
+        sent = 0
+
+async def _send_file_response(
+    loop: asyncio.AbstractEventLoop,
+    client_sock: asyncio.StreamWriter,
+    res: Response,
+    pending_writes: List[bytes]
+) -> None:
+    """
+    Send a file-backed response, preceded by any held-back responses.
+
+    The headers go out with sock_sendall and the body with sock_sendfile,
+    which uses os.sendfile where the platform supports it so the file is
+    copied by the kernel without passing through Python.
+
+    Args:
+        loop: The event loop
+        client_sock: The client socket
+        res: The response with file_path set
+        pending_writes: Encoded responses that must be sent first
+    """
+    with open(res.file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        pending_writes.append(res.headers_to_bytes(size))
+        await loop.sock_sendall(client_sock, b"".join(pending_writes))
+        if size:
+            await loop.sock_sendfile(client_sock, f)
+
+async def handle_http1_connection(
+    loop: asyncio.AbstractEventLoop,
+    client_sock: asyncio.StreamWriter,
+    reader: Optional[asyncio.StreamReader],
+    writer: Optional[asyncio.StreamWriter],
+    initial_data: Optional[bytearray] = None,
+    conn_buffer: Optional[ConnectionBuffer] = None,
+    buffered: int = 0
+) -> Optional[Request]:
     """
     Handle an HTTP/1.1 connection.
 
@@ -199,37 +525,116 @@ async def handle_http1_connection(
         client_sock: The client socket
         reader: The stream reader
         writer: The stream writer
+        initial_data: Optional bytes already read from the socket, parsed
+            before anything else is read. Bytes received past the last
+            parsed request are left in it.
+        conn_buffer: Optional receive buffer for the connection, taken
+            from the pool when not given. It is returned to the pool when
+            the connection ends.
+        buffered: Number of bytes already read into the start of
+            conn_buffer, parsed before anything else is read
+
+    Returns:
+        The request if a kept-alive connection asked for a WebSocket upgrade,
+        which the caller then completes on the socket, otherwise None
     """
     keep_alive = True
+    upgrade = None
+    # Bytes received but not parsed yet (peeked data and pipelined requests)
+    pending = initial_data if initial_data is not None else bytearray()
+    pending_writes = []  # Responses held back to be sent in a single call
+    pending_size = 0
+    # Recycled across the requests of this connection, and taken from the
+    # pools left by earlier connections when possible
+    req = _REQUEST_POOL.pop() if _REQUEST_POOL else None
+    if conn_buffer is None:
+        conn_buffer = acquire_buffer()
+    if buffered and conn_buffer.data.startswith(b"\r\n"):
+        # Rare: leading empty lines are skipped from pending, so parse from there
+        pending += conn_buffer.view[:buffered]
+        buffered = 0
 
     while keep_alive:
         try:
-            keep_alive, req = await handle_http1_request(loop, client_sock, reader, writer)
+            # Peeked bytes belong to the first request only, even if it fails
+            first_buffered, buffered = buffered, 0
+            keep_alive, parsed = await handle_http1_request(
+                loop, client_sock, reader, writer, pending, req, conn_buffer, first_buffered
+            )
+
+            if not parsed:
+                break
+            req = parsed
 
-            if not req:
+            # Hand a WebSocket upgrade on a reused connection back to the caller
+            if req.headers.get("Upgrade", "").lower() == "websocket":
+                upgrade = req
                 break
 
             # Route matching
-            for route in ROUTES:
-                path_params = route.match(req.method, req.path)
-                if path_params is not None:  # Check if path_params is not None instead of truthy
-                    req.path_params = path_params
-                    if req.method == "HEAD":
-                        req.method = "GET"
-                        res = await route.handler(req)
-                        res.body = ""
-                    else:
-                        res = await route.handler(req)
+            found = find_route(req.method, req.path)
+            if found is not None:
+                route, req.path_params = found
+                if req.method == "HEAD":
+                    req.method = "GET"
+                    res = await route.handler(req)
+                    res.body = ""
+                    res.file_path = None
+                else:
+                    res = await route.handler(req)
 
-                    if keep_alive:
-                        res.headers['Connection'] = 'keep-alive'
+                if keep_alive:
+                    res.headers['Connection'] = 'keep-alive'
+                else:
+                    res.headers['Connection'] = 'close'
+
+                if res.file_path is not None:
+                    # File bodies bypass the response queue and go out via sendfile
+                    await _send_file_response(loop, client_sock, res, pending_writes)
+                    pending_writes.clear()
+                    pending_size = 0
+                    data = None
+                else:
+                    head, body = res.to_buffers()
+                    if len(body) >= WRITE_COALESCE_SIZE:
+                        # Send large bodies without copying them into one buffer
+                        pending_writes.append(head)
+                        await _sock_sendmsg(loop, client_sock, [b"".join(pending_writes), body])
+                        pending_writes.clear()
+                        pending_size = 0
+                        data = None
                     else:
-                        res.headers['Connection'] = 'close'
-
-                    await loop.sock_sendall(client_sock, res.to_bytes())
-                    break
+                        data = head + body
             else:
-                await loop.sock_sendall(client_sock, Response("Not Found", HTTP_404_NOT_FOUND).to_bytes())
+                data = Response("Not Found", HTTP_404_NOT_FOUND).to_bytes()
+
+            if data is None:
+                continue
+
+            pending_writes.append(data)
+            pending_size += len(data)
+
+            # While the client has another complete request head buffered,
+            # hold the response back so that several responses share one
+            # send call. A partial head means the next step is a read, so
+            # the responses must go out first.
+            if keep_alive and pending_size < WRITE_COALESCE_SIZE and pending.find(b"\r\n\r\n") != -1:
+                continue
+
+            await loop.sock_sendall(client_sock, b"".join(pending_writes))
+            pending_writes.clear()
+            pending_size = 0
+
+        except RequestError as e:
+            # The rest of the request was never read, so the connection can't be reused
+            error_response = Response(str(e), e.status, {'Connection': 'close'})
+            pending_writes.append(error_response.to_bytes())
+            try:
+                await loop.sock_sendall(client_sock, b"".join(pending_writes))
+            except OSError:
+                pass
+            pending_writes.clear()
+            break
 
         except Exception as e:
             try:
@@ -238,10 +643,27 @@ async def handle_http1_connection(
                     error_response.headers['Connection'] = 'keep-alive'
                 else:
                     error_response.headers['Connection'] = 'close'
-                await loop.sock_sendall(client_sock, error_response.to_bytes())
+                pending_writes.append(error_response.to_bytes())
+                await loop.sock_sendall(client_sock, b"".join(pending_writes))
             except:
                 pass  # Ignore errors when sending error response
+            pending_writes.clear()
+            pending_size = 0
 
             # Only break if keep_alive is False
             if not keep_alive:
                 break
+
+    # Flush responses still held back if the connection ended mid-pipeline
+    if pending_writes:
+        try:
+            await loop.sock_sendall(client_sock, b"".join(pending_writes))
+        except OSError:
+            pass
+
+    # Return the connection state to the pools; an upgrade request lives on
+    release_buffer(conn_buffer)
+    if req is not None and upgrade is None and len(_REQUEST_POOL) < CONNECTION_POOL_SIZE:
+        _REQUEST_POOL.append(req)
+
+    return upgrade
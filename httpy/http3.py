@@ -12,9 +12,9 @@ import logging
 from typing import Dict, Any, Optional, List, Tuple, Callable, Union
 from urllib.parse import urlparse
 
-from .request import Request
+from .request import Request, parse_query_string
 from .response import Response
-from .routing import ROUTES
+from .routing import find_route
 from .status import (
     HTTP_404_NOT_FOUND,
     HTTP_500_INTERNAL_SERVER_ERROR
@@ -103,38 +103,29 @@ if AIOQUIC_AVAILABLE:
             method = request_data["method"]
             path = request_data["path"]
             headers = request_data["headers"]
-            body = request_data["body"].decode("utf-8", errors="replace")
+            body = request_data["body"]
 
             # Parse query parameters
             query_params = {}
             if "?" in path:
                 path, query_string = path.split("?", 1)
-                # Simple query parameter parsing
-                for param in query_string.split("&"):
-                    if "=" in param:
-                        key, value = param.split("=", 1)
-                        query_params[key] = value
-                    else:
-                        query_params[param] = ""
+                query_params = parse_query_string(query_string)
 
             # Create request object
             req = Request(method, path, headers, body, {}, query_params)
 
             # Find matching route
             response = None
-            for route in ROUTES:
-                path_params = route.match(method, path)
-                if path_params is not None:
-                    req.path_params = path_params
-                    try:
-                        response = await route.handler(req)
-                        break
-                    except Exception as e:
-                        response = Response(
-                            f"Internal Server Error: {str(e)}",
-                            HTTP_500_INTERNAL_SERVER_ERROR
-                        )
-                        break
+            found = find_route(method, path)
+            if found is not None:
+                route, req.path_params = found
+                try:
+                    response = await route.handler(req)
+                except Exception as e:
+                    response = Response(
+                        f"Internal Server Error: {str(e)}",
+                        HTTP_500_INTERNAL_SERVER_ERROR
+                    )
 
             if response is None:
                 response = Response("Not Found", HTTP_404_NOT_FOUND)
@@ -168,8 +159,8 @@ if AIOQUIC_AVAILABLE:
             # Send headers
             self.h3.send_headers(stream_id, headers, end_stream=False)
 
-            # Send body
-            self.h3.send_data(stream_id, response.body.encode(), end_stream=True)
+            # Send body; file responses keep an empty body and are read here
+            self.h3.send_data(stream_id, response.body_bytes(), end_stream=True)
 
         def quic_event_received(self, event: QuicEvent) -> None:
             """
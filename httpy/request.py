@@ -5,11 +5,60 @@ This module provides the Request class for handling HTTP requests.
 """
 
 import json
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import unquote_plus
+
+from .headers import CIDict
+
+# orjson is optional; when installed it parses JSON bodies several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def parse_query_string(query_string: str) -> Dict[str, Union[str, List[str]]]:
+    """
+    Parse a URL query string in a single pass.
+
+    Keys that appear once map to a string and repeated keys map to a list of
+    strings. Like urllib.parse.parse_qs, pairs with a blank value are skipped.
+
+    Args:
+        query_string: The query string without the leading '?'
+
+    Returns:
+        A dictionary of query parameters
+    """
+    params: Dict[str, Union[str, List[str]]] = {}
+    # Only pay for unquoting when the string contains escapes
+    needs_unquote = '%' in query_string or '+' in query_string
+    for pair in query_string.split('&'):
+        name, _, value = pair.partition('=')
+        if not value:
+            continue
+        if needs_unquote:
+            name = unquote_plus(name)
+            value = unquote_plus(value)
+
+        existing = params.get(name)
+        if existing is None:
+            params[name] = value
+        elif isinstance(existing, list):
+            existing.append(value)
+        else:
+            params[name] = [existing, value]
+    return params
+
 
 class Request:
     """Represents an HTTP request to the server."""
 
+    # One Request is created or reset per request, so skip the instance dict
+    __slots__ = ("method", "path", "headers", "body", "path_params", "query_params",
+                 "_body_bytes", "_text", "_json_cache", "_json_parsed")
+
     def __init__(self, method: str, path: str, headers: Dict[str, str], body: Union[str, bytes], 
                  path_params: Dict[str, str], query_params: Optional[Dict[str, Union[str, list]]] = None):
         """
@@ -19,13 +68,33 @@ class Request:
             method: The HTTP method (GET, POST, etc.)
             path: The request path
             headers: The HTTP headers
-            body: The request body (string or bytes)
+            body: The request body (bytes from the server, or a string)
+            path_params: Parameters extracted from the path
+            query_params: Query parameters from the URL
+        """
+        self.reset(method, path, headers, body, path_params, query_params)
+
+    def reset(self, method: str, path: str, headers: Dict[str, str], body: Union[str, bytes],
+              path_params: Dict[str, str], query_params: Optional[Dict[str, Union[str, list]]] = None) -> None:
+        """
+        Reinitialize the request in place with new request data.
+
+        The HTTP/1.1 handler uses this to recycle one Request object across
+        the requests of a keep-alive connection, so handlers should copy any
+        request data they need to keep after returning a response.
+
+        Args:
+            method: The HTTP method (GET, POST, etc.)
+            path: The request path
+            headers: The HTTP headers
+            body: The request body (bytes from the server, or a string)
             path_params: Parameters extracted from the path
             query_params: Query parameters from the URL
         """
         self.method = method
         self.path = path
-        self.headers = headers
+        # Header names are case-insensitive; the HTTP/1.1 parser already builds a CIDict
+        self.headers = headers if isinstance(headers, CIDict) else CIDict(headers)
         self.body = body
         self.path_params = path_params
         self.query_params = query_params or {}
@@ -33,10 +102,31 @@ class Request:
         # Store raw body bytes if provided as bytes
         self._body_bytes = body if isinstance(body, bytes) else None
 
+        # Cache for the decoded body
+        self._text = None
+
         # Cache for parsed JSON data
         self._json_cache = None
         self._json_parsed = False
 
+    @property
+    def text(self) -> str:
+        """
+        The request body decoded as UTF-8.
+
+        The body is decoded on first access and cached, so handlers that
+        never need it as a string skip the decode entirely.
+
+        Returns:
+            The body as a string, with invalid bytes replaced
+        """
+        if self._text is None:
+            if isinstance(self.body, str):
+                self._text = self.body
+            else:
+                self._text = self.body.decode('utf-8', errors='replace')
+        return self._text
+
     def json(self) -> Optional[Any]:
         """
         Parse the request body as JSON.
@@ -51,9 +141,14 @@ class Request:
             return self._json_cache
 
         try:
-            # Handle both string and bytes body
-            if isinstance(self.body, bytes):
-                self._json_cache = json.loads(self.body.decode('utf-8'))
+            # Both parsers accept bytes directly, so the body is never decoded separately
+            if ORJSON_AVAILABLE:
+                try:
+                    self._json_cache = orjson.loads(self.body)
+                except orjson.JSONDecodeError:
+                    # orjson only reads UTF-8 and rejects NaN and integers
+                    # beyond 64 bits, which json accepts
+                    self._json_cache = json.loads(self.body)
             else:
                 self._json_cache = json.loads(self.body)
             self._json_parsed = True
@@ -5,17 +5,31 @@ This module provides the Response class for handling HTTP responses.
 """
 
 import json
-import io
-from typing import Dict, Any, Optional, Union, Callable
+import mimetypes
+import time
+from email.utils import formatdate
+from typing import Dict, Any, List, Optional, Tuple, Union, Callable
 
+from .headers import header_name
 from .status import HTTP_STATUS_CODES
 
+# orjson is optional; when installed it serializes JSON responses several times faster
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # Cache of status lines for common status codes
 STATUS_LINE_CACHE = {
     code: f"HTTP/1.1 {code} {reason}\r\n".encode()
     for code, reason in HTTP_STATUS_CODES.items()
 }
 
+# Cache of encoded Content-Length values for small bodies
+CONTENT_LENGTH_CACHE_SIZE = 4096
+CONTENT_LENGTH_CACHE = [str(i).encode() for i in range(CONTENT_LENGTH_CACHE_SIZE)]
+
 # Common headers as bytes to avoid repeated encoding
 CONTENT_TYPE_JSON = b"Content-Type: application/json\r\n"
 CONTENT_TYPE_TEXT = b"Content-Type: text/plain\r\n"
@@ -24,6 +38,78 @@ CONNECTION_KEEP_ALIVE = b"Connection: keep-alive\r\n"
 CONNECTION_CLOSE = b"Connection: close\r\n"
 CRLF = b"\r\n"
 
+# Headers of a JSON response, copied for responses created without headers
+JSON_HEADERS = {'Content-Type': 'application/json'}
+
+# Headers whose values repeat across responses. Only their lines are cached, so
+# per-response values such as Set-Cookie, Location or ETag never fill the cache
+CACHED_HEADER_NAMES = frozenset({
+    "content-type", "connection", "server", "cache-control", "vary",
+    "content-encoding", "access-control-allow-origin", "x-content-type-options",
+    "x-frame-options", "strict-transport-security",
+})
+
+# Encoded header lines by (name, value), so repeated headers are formatted once.
+# Only str values are cached: equal values of other types, such as 1 and True,
+# would otherwise share a line.
+HEADER_LINE_CACHE: Dict[Tuple[str, str], bytes] = {}
+
+# Upper bound for HEADER_LINE_CACHE, so varying values of cached headers can't grow it
+HEADER_LINE_CACHE_SIZE = 1024
+
+# Date header of the current second, reformatted only when the second changes
+_date_second = -1
+_date_header_bytes = b""
+
+def _date_header() -> bytes:
+    """
+    Get the Date header line for the current time.
+
+    The header has one-second resolution, so it is formatted at most once a
+    second and shared by every response sent within that second.
+
+    Returns:
+        The encoded Date header line
+    """
+    global _date_second, _date_header_bytes
+    now = int(time.time())
+    if now != _date_second:
+        _date_header_bytes = b"Date: " + formatdate(now, usegmt=True).encode() + CRLF
+        _date_second = now
+    return _date_header_bytes
+
+def _header_line(name: str, value: Any) -> bytes:
+    """
+    Encode one header line.
+
+    Args:
+        name: The header name
+        value: The header value
+
+    Returns:
+        The encoded line with its CRLF, or b"" for Content-Length, which is
+        always written from the body length
+    """
+    key = name.lower()
+    if key == 'content-length':
+        return b""
+
+    # Use the shared constants for common headers
+    if key == 'content-type':
+        lowered = value.lower()
+        if lowered == 'application/json':
+            return CONTENT_TYPE_JSON
+        elif lowered == 'text/plain':
+            return CONTENT_TYPE_TEXT
+    elif key == 'connection':
+        lowered = value.lower()
+        if lowered == 'keep-alive':
+            return CONNECTION_KEEP_ALIVE
+        elif lowered == 'close':
+            return CONNECTION_CLOSE
+
+    return f"{name}: {value}\r\n".encode()
+
 class Response:
     """Represents an HTTP response from the server."""
 
@@ -37,92 +123,166 @@ class Response:
             headers: Optional HTTP headers
         """
         self.status = status
-        self.body = body
+        self.body = body  # Also sets the encoded body cache
         self.headers = headers or {}
-        self._encoded_body = body if isinstance(body, bytes) else None  # Cache for encoded body
+        self.file_path: Optional[str] = None  # Set for responses streamed from a file
+
+    @property
+    def body(self) -> Union[str, bytes]:
+        """The response body as a string or bytes."""
+        return self._body
+
+    @body.setter
+    def body(self, body: Union[str, bytes]) -> None:
+        # Replacing the body drops the encoded copy, so it is never sent stale
+        self._body = body
+        self._encoded_body = body if isinstance(body, bytes) else None
 
     def to_bytes(self) -> bytes:
         """
         Convert the response to bytes for sending over the network.
 
         This method is optimized for performance, especially with large responses.
+        File responses are read into memory here; the HTTP/1.1 handler sends
+        them with headers_to_bytes() and sendfile instead.
 
         Returns:
             The HTTP response as bytes
         """
-        # Use a BytesIO buffer for efficient concatenation
-        buffer = io.BytesIO()
+        encoded_body = self.body_bytes()
 
-        # Write status line (use cached version if available)
-        status_line = STATUS_LINE_CACHE.get(self.status)
-        if status_line:
-            buffer.write(status_line)
-        else:
-            reason = HTTP_STATUS_CODES.get(self.status, "Unknown")
-            buffer.write(f"HTTP/1.1 {self.status} {reason}\r\n".encode())
+        # Collect the encoded parts and join them once
+        parts = []
+        self._append_headers(parts, len(encoded_body))
+        parts.append(encoded_body)
+        return b"".join(parts)
+
+    def to_buffers(self) -> Tuple[bytes, bytes]:
+        """
+        Convert the response to separate head and body buffers.
+
+        Unlike to_bytes() the body is not copied into a combined buffer,
+        which matters for large bodies that are sent with a gathering write.
+
+        Returns:
+            A tuple of (head, body) where head is the status line and headers
+        """
+        encoded_body = self.body_bytes()
+        return self.headers_to_bytes(len(encoded_body)), encoded_body
 
-        # Encode body only once
+    def body_bytes(self) -> bytes:
+        """
+        Get the encoded body, encoding it only once.
+
+        Protocol handlers that frame the body themselves, such as HTTP/3, use
+        this instead of body, which is empty for file responses.
+
+        Returns:
+            The body as bytes, read from file_path for file responses
+        """
+        if self.file_path is not None:
+            with open(self.file_path, 'rb') as f:
+                return f.read()
         if self._encoded_body is None:
             if isinstance(self.body, str):
                 self._encoded_body = self.body.encode('utf-8')
             else:
                 self._encoded_body = self.body  # Already bytes
+        return self._encoded_body
 
-        # Set content length
-        content_length = len(self._encoded_body)
-        buffer.write(CONTENT_LENGTH)
-        buffer.write(str(content_length).encode())
-        buffer.write(CRLF)
-
-        # Write headers
-        for k, v in self.headers.items():
-            # Skip content-length as we've already added it
-            if k.lower() == 'content-length':
-                continue
+    def headers_to_bytes(self, content_length: int) -> bytes:
+        """
+        Convert the status line and headers to bytes, without the body.
 
-            # Use cached headers for common cases
-            if k.lower() == 'content-type':
-                if v.lower() == 'application/json':
-                    buffer.write(CONTENT_TYPE_JSON)
-                    continue
-                elif v.lower() == 'text/plain':
-                    buffer.write(CONTENT_TYPE_TEXT)
-                    continue
-            elif k.lower() == 'connection':
-                if v.lower() == 'keep-alive':
-                    buffer.write(CONNECTION_KEEP_ALIVE)
-                    continue
-                elif v.lower() == 'close':
-                    buffer.write(CONNECTION_CLOSE)
-                    continue
-
-            # For other headers, encode them normally
-            buffer.write(f"{k}: {v}\r\n".encode())
+        Args:
+            content_length: The length of the body that will follow
 
-        # End of headers
-        buffer.write(CRLF)
+        Returns:
+            The HTTP response head as bytes, ending with the blank line
+        """
+        parts = []
+        self._append_headers(parts, content_length)
+        return b"".join(parts)
 
-        # Write body
-        buffer.write(self._encoded_body)
+    def _append_headers(self, parts: List[bytes], content_length: int) -> None:
+        """
+        Append the encoded status line and headers to a list of parts.
 
-        return buffer.getvalue()
+        Args:
+            parts: The list to append to
+            content_length: The value of the Content-Length header
+        """
+        # Status line (use cached version if available)
+        status_line = STATUS_LINE_CACHE.get(self.status)
+        if status_line is None:
+            status_line = f"HTTP/1.1 {self.status} Unknown\r\n".encode()
+            # Cache lines for unregistered three-digit codes too, so custom
+            # statuses are only formatted once
+            if isinstance(self.status, int) and 100 <= self.status <= 999:
+                STATUS_LINE_CACHE[self.status] = status_line
+        parts.append(status_line)
+
+        # Date is required from origin servers. Handlers may set their own
+        # under any case, which empties this slot in the header loop below
+        date_index = len(parts)
+        parts.append(_date_header())
+
+        # Set content length
+        parts.append(CONTENT_LENGTH)
+        if content_length < CONTENT_LENGTH_CACHE_SIZE:
+            parts.append(CONTENT_LENGTH_CACHE[content_length])
+        else:
+            parts.append(b"%d" % content_length)
+        parts.append(CRLF)
+
+        # Headers, using the cached line for common headers already sent once
+        for item in self.headers.items():
+            name = header_name(item[0])
+            if name == "date":
+                parts[date_index] = b""
+            if item[1].__class__ is not str or name not in CACHED_HEADER_NAMES:
+                parts.append(_header_line(*item))
+                continue
+            line = HEADER_LINE_CACHE.get(item)
+            if line is None:
+                line = _header_line(*item)
+                if len(HEADER_LINE_CACHE) < HEADER_LINE_CACHE_SIZE:
+                    HEADER_LINE_CACHE[item] = line
+            parts.append(line)
+
+        # End of headers
+        parts.append(CRLF)
 
     @staticmethod
     def json(data: Any, status: int = 200, headers: Optional[Dict[str, Any]] = None) -> 'Response':
         """
         Create a JSON response.
 
+        Non-ASCII text is written as raw UTF-8 rather than \\u escapes. NaN and
+        infinities have no JSON literal: orjson writes them as null, while
+        the json fallback writes NaN and Infinity.
+
         Args:
             data: The data to serialize as JSON
             status: The HTTP status code
             headers: Optional HTTP headers
 
         Returns:
-            A Response object with JSON content
+            A Response object with JSON content, with the body as UTF-8 bytes
         """
-        body = json.dumps(data, separators=(',', ':'))  # Use compact JSON encoding
-        headers = headers or {}
-        headers['Content-Type'] = 'application/json'
+        if ORJSON_AVAILABLE:
+            try:
+                body = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                # Integers beyond 64 bits and subclasses orjson can't encode
+                body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+        else:
+            # Compact and unescaped, matching orjson's output
+            body = json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode()
+        if headers:
+            headers['Content-Type'] = 'application/json'
+        else:
+            headers = JSON_HEADERS.copy()
         return Response(body, status, headers)
 
     @staticmethod
@@ -192,3 +352,30 @@ class Response:
         headers = headers or {}
         headers['Content-Type'] = 'application/octet-stream'
         return Response(data, status, headers)
+
+    @staticmethod
+    def file(path: str, status: int = 200, headers: Optional[Dict[str, Any]] = None,
+             content_type: Optional[str] = None) -> 'Response':
+        """
+        Create a response that streams the contents of a file.
+
+        The file is read when the response is sent. Over HTTP/1.1 it is
+        handed to the kernel with sendfile where available, so the body
+        is never copied into Python memory.
+
+        Args:
+            path: Path of the file to send
+            status: The HTTP status code
+            headers: Optional HTTP headers
+            content_type: The content type (guessed from the file name by default)
+
+        Returns:
+            A Response object backed by the file
+        """
+        headers = headers or {}
+        if content_type is None:
+            content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        headers['Content-Type'] = content_type
+        response = Response(b"", status, headers)
+        response.file_path = path
+        return response
@@ -5,12 +5,207 @@ This module provides the Route class and routing decorators for the HTTP server.
 """
 
 import re
-from typing import Dict, Any, List, Callable, Optional, Pattern
+from typing import Dict, Any, List, Callable, Optional, Pattern, Tuple
 
 from .request import Request
 
+# Characters that make a path segment match more than its literal text
+REGEX_SPECIAL_PATTERN = re.compile(r'[.^$*+?()\[\]{}|\\]')
+
+# Named group openings, turned into plain groups when route regexes are merged
+NAMED_GROUP_PATTERN = re.compile(r'\(\?P<\w+>')
+
+class _TrieNode:
+    """
+    A node of the path segment trie used by find_route().
+
+    Literal segments are looked up in a dict of children, a parameter
+    segment follows the single param edge, and a node that ends a route
+    holds the first registered route with that shape.
+    """
+
+    __slots__ = ("children", "param", "route")
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.param: Optional['_TrieNode'] = None
+        self.route: Optional[Tuple[int, 'Route']] = None
+
+    def insert(self, segments: List[Optional[str]], position: int, route: 'Route') -> None:
+        """
+        Add a route below this node.
+
+        Args:
+            segments: The route's path segments, with None for parameters
+            position: The route's position in ROUTES
+            route: The route
+        """
+        node = self
+        for segment in segments:
+            if segment is None:
+                if node.param is None:
+                    node.param = _TrieNode()
+                node = node.param
+            else:
+                child = node.children.get(segment)
+                if child is None:
+                    child = node.children[segment] = _TrieNode()
+                node = child
+        if node.route is None:
+            node.route = (position, route)
+
+    def match(self, segments: List[str], index: int, values: List[str]) -> Optional[Tuple[int, 'Route', List[str]]]:
+        """
+        Find the first registered route below this node matching the segments.
+
+        Args:
+            segments: The request path segments
+            index: The index of the first segment to match at this node
+            values: The parameter values collected so far
+
+        Returns:
+            A tuple of (position, route, parameter values) for the earliest
+            registered matching route, or None
+        """
+        if index == len(segments):
+            if self.route is None:
+                return None
+            return self.route[0], self.route[1], values
+
+        segment = segments[index]
+        best = None
+        child = self.children.get(segment)
+        if child is not None:
+            best = child.match(segments, index + 1, values)
+        # A parameter matches any non-empty segment, as [^/]+ does
+        if self.param is not None and segment:
+            found = self.param.match(segments, index + 1, values + [segment])
+            if found is not None and (best is None or found[0] < best[0]):
+                best = found
+        return best
+
+
+class RouteList(list):
+    """
+    A list of routes that keeps a lookup index for find_route().
+
+    The index is dropped whenever the list is modified and rebuilt on the
+    next lookup, so routes can still be added and removed as with a list.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._index = None
+
+    def append(self, route):
+        super().append(route)
+        self._index = None
+
+    def extend(self, routes):
+        super().extend(routes)
+        self._index = None
+
+    def insert(self, position, route):
+        super().insert(position, route)
+        self._index = None
+
+    def remove(self, route):
+        super().remove(route)
+        self._index = None
+
+    def pop(self, *args):
+        self._index = None
+        return super().pop(*args)
+
+    def clear(self):
+        super().clear()
+        self._index = None
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._index = None
+
+    def reverse(self):
+        super().reverse()
+        self._index = None
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._index = None
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._index = None
+
+    def __iadd__(self, routes):
+        self._index = None
+        return super().__iadd__(routes)
+
+    def build_index(self) -> Tuple[Dict[Tuple[str, str], 'Route'], Dict[Tuple[str, str], Tuple[int, 'Route']], Dict[str, _TrieNode], Dict[str, Tuple[Pattern, Dict[int, Tuple[int, 'Route', List[Tuple[str, int]]]]]]]:
+        """
+        Build the lookup index for the current routes.
+
+        Parametric routes whose other segments are plain text go into a
+        segment trie per method, so a lookup costs a few dict probes per
+        path segment however many routes there are. The remaining parametric
+        routes, whose segments contain regex characters, are merged into one
+        regex per method with one alternative per route, in registration
+        order, so a single match call finds the first of them that matches.
+
+        Literal routes registered before every parametric route of their
+        method can't be shadowed, so they are also put in a static dict that
+        find_route() returns from straight away.
+
+        Returns:
+            A tuple of (static, literal, trie, parametric) where static maps
+            (method, path key) to a literal route that no parametric route
+            precedes, literal maps (method, path key) to the first (position,
+            route) with that literal path, trie maps each method to the root of its segment trie, and
+            parametric maps each method to its merged regex and a dict from the
+            group number of each alternative to (position, route,
+            [(param name, group number)])
+        """
+        static = {}
+        literal = {}
+        trie = {}
+        buckets = {}
+        parametric_methods = set()
+        for position, route in enumerate(self):
+            if route.literal_path is not None:
+                key = (route.method, route.literal_path)
+                if key not in literal:
+                    literal[key] = (position, route)
+                    if route.method not in parametric_methods:
+                        static[key] = route
+                continue
+            parametric_methods.add(route.method)
+            if route.segments is not None:
+                root = trie.get(route.method)
+                if root is None:
+                    root = trie[route.method] = _TrieNode()
+                root.insert(route.segments, position, route)
+            else:
+                buckets.setdefault(route.method, []).append((position, route))
+
+        parametric = {}
+        for method, bucket in buckets.items():
+            alternatives = []
+            groups = {}
+            group = 1
+            for position, route in bucket:
+                # Named groups can't repeat across alternatives, so use plain
+                # groups and map the parameter names to their group numbers
+                alternatives.append("(" + NAMED_GROUP_PATTERN.sub("(", route.regex.pattern) + ")")
+                params = [(name, group + index) for name, index in route.regex.groupindex.items()]
+                groups[group] = (position, route, params)
+                group += 1 + route.regex.groups
+            parametric[method] = (re.compile("|".join(alternatives)), groups)
+
+        self._index = (static, literal, trie, parametric)
+        return self._index
+
 # Global list of routes
-ROUTES: List['Route'] = []
+ROUTES: List['Route'] = RouteList()
 
 class Route:
     """Represents a route in the HTTP server."""
@@ -27,6 +222,25 @@ class Route:
         self.method = method.upper()
         self.handler = handler
         self.regex, self.param_names = self._compile_path(path)
+        # Paths without parameters or regex characters are looked up by key,
+        # and parametric paths whose other segments are plain text by segment
+        stripped = path.strip("/")
+        self.literal_path = None
+        self.segments = None
+        if not self.param_names:
+            if not REGEX_SPECIAL_PATTERN.search(stripped):
+                self.literal_path = stripped
+        else:
+            segments = []
+            for part in stripped.split("/"):
+                if part.startswith("{") and part.endswith("}"):
+                    segments.append(None)
+                elif REGEX_SPECIAL_PATTERN.search(part):
+                    break
+                else:
+                    segments.append(part)
+            else:
+                self.segments = segments
 
     def _compile_path(self, path: str) -> tuple[Pattern, List[str]]:
         """
@@ -66,6 +280,56 @@ class Route:
         m = self.regex.match(path)
         return m.groupdict() if m else None
 
+def find_route(method: str, path: str) -> Optional[Tuple['Route', Dict[str, str]]]:
+    """
+    Find the first registered route matching the given method and path.
+
+    Routes without parameters are found with a dict lookup, which ends the
+    search when no parametric route was registered before them. Parametric
+    routes are found by walking the method's segment trie, and any with
+    regex characters are tried with one merged regex. The earliest
+    registered of the candidates wins, so the result is the same as scanning
+    ROUTES in order.
+
+    Args:
+        method: The HTTP method
+        path: The request path
+
+    Returns:
+        A tuple of (route, path parameters) if a route matched, None otherwise
+    """
+    static, literal, trie, parametric = ROUTES._index or ROUTES.build_index()
+
+    # Same normalization as the route regex: one optional slash at each end
+    key = path[1:] if path[:1] == "/" else path
+    if key[-1:] == "/":
+        key = key[:-1]
+    route = static.get((method, key))
+    if route is not None:
+        return route, {}
+    found = literal.get((method, key))
+    params = None
+
+    root = trie.get(method)
+    if root is not None:
+        matched = root.match(key.split("/"), 0, [])
+        if matched is not None and (found is None or matched[0] < found[0]):
+            found = matched
+            params = dict(zip(matched[1].param_names, matched[2]))
+
+    merged = parametric.get(method)
+    if merged is not None:
+        m = merged[0].match(path)
+        if m:
+            # The outermost group of the matching alternative closes last
+            position, route, groups = merged[1][m.lastindex]
+            if found is None or position < found[0]:
+                return route, {name: m.group(group) for name, group in groups}
+
+    if found is None:
+        return None
+    return found[1], params if params is not None else {}
+
 def route(method: str, path: str) -> Callable:
     """
     Decorator to register a route.
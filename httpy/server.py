@@ -8,7 +8,7 @@ import asyncio
 import socket
 import os
 import ssl
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 from .logging import logger
 
@@ -18,10 +18,10 @@ from .status import (
 )
 from .request import Request
 from .response import Response
-from .routing import ROUTES, Route
+from .routing import find_route
 from .websocket import handle_websocket_handshake, WebSocketConnection
 from .http2 import upgrade_to_http2, handle_http2_connection
-from .http1 import handle_http1_connection
+from .http1 import handle_http1_connection, acquire_buffer, release_buffer, ConnectionBuffer, BUFFER_SIZE
 
 # Try to import HTTP/3 support
 try:
@@ -41,44 +41,119 @@ async def handle_socket(client_sock: socket.socket) -> None:
     client_addr = client_sock.getpeername()
     logger.debug(f"New connection from {client_addr[0]}:{client_addr[1]}")
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     client_sock.setblocking(False)
 
-    # Create StreamReader/StreamWriter for protocol support
-    reader, writer = await asyncio.open_connection(sock=client_sock)
-
-    # First check for WebSocket or HTTP/2 upgrade
+    # Read the start of the request straight into a pooled receive buffer to
+    # check for upgrades, so plain HTTP/1.1 connections never pay for stream
+    # plumbing and parse the peeked bytes where they are
+    conn_buffer = acquire_buffer()
     try:
-        # Read the first part of the request to check for upgrades
-        data = await reader.readuntil(b"\r\n\r\n")
-        # Put the data back in the buffer - use feed_data instead of extendleft
-        reader.feed_data(data)
+        buffer_len, header_end = await _peek_request_head(loop, client_sock, conn_buffer)
+    except OSError as e:
+        logger.debug(f"Error reading from {client_addr[0]}:{client_addr[1]}: {str(e)}")
+        buffer_len = 0
+    if not buffer_len:
+        release_buffer(conn_buffer)
+        client_sock.close()
+        return
+
+    if header_end != -1:
+        # Lowercase the header block once for all checks below. bytes.lower()
+        # is ASCII-only already and is faster than bytes.translate() with an
+        # ASCII table. The CRLF anchors keep matches to header names, so a
+        # request path such as "/connection:" can't trigger an upgrade.
+        head = conn_buffer.data[:header_end].lower()
 
         # Check for WebSocket upgrade
-        if b"upgrade: websocket" in data.lower() and b"connection:" in data.lower() and b"upgrade" in data.lower():
-            # Handle WebSocket connection
+        if b"\r\nupgrade: websocket" in head and b"\r\nconnection:" in head:
             logger.debug("WebSocket upgrade requested")
+            data = bytes(conn_buffer.view[:buffer_len])
+            release_buffer(conn_buffer)
+            reader, writer = await _open_stream(client_sock, data)
             await handle_websocket_connection(reader, writer)
             return
 
         # Check for HTTP/2 upgrade
-        elif b"upgrade: h2c" in data.lower() and b"connection:" in data.lower() and b"upgrade" in data.lower():
-            # Handle HTTP/2 connection
+        if b"\r\nupgrade: h2c" in head and b"\r\nconnection:" in head:
             logger.debug("HTTP/2 upgrade requested")
+            data = bytes(conn_buffer.view[:buffer_len])
+            release_buffer(conn_buffer)
+            reader, writer = await _open_stream(client_sock, data)
             await handle_http2_connection(reader, writer)
             return
 
-    except Exception as e:
-        # If there's an error checking for upgrades, fall back to HTTP/1.1
-        logger.error(f"Error checking for protocol upgrades: {str(e)}")
-        logger.debug("Falling back to HTTP/1.1")
-
-    # Handle HTTP/1.1 connection
-    await handle_http1_connection(loop, client_sock, reader, writer)
+    # Handle HTTP/1.1 connection, starting from the bytes already read. The
+    # buffer goes back to the pool when the connection ends.
+    pending = bytearray()
+    upgrade = await handle_http1_connection(loop, client_sock, None, None, pending, conn_buffer, buffer_len)
+    if upgrade is not None:
+        # A kept-alive connection switched to WebSocket after earlier requests
+        logger.debug("WebSocket upgrade requested")
+        reader, writer = await _open_stream(client_sock, bytes(pending))
+        await _serve_websocket(upgrade, reader, writer)
+        return
 
     # Close the socket when done
     client_sock.close()
 
+async def _peek_request_head(
+    loop: asyncio.AbstractEventLoop,
+    client_sock: socket.socket,
+    conn_buffer: ConnectionBuffer
+) -> Tuple[int, int]:
+    """
+    Read from a client socket until the end of the request header block.
+
+    Reading stops at the first blank line, when BUFFER_SIZE bytes have been
+    read, or when the client closes the connection. The bytes are read into
+    the start of conn_buffer, so the protocol handler can parse them in place.
+
+    Args:
+        loop: The event loop
+        client_sock: The client socket
+        conn_buffer: The receive buffer of the connection
+
+    Returns:
+        A tuple of (buffer_len, header_end) where buffer_len is the number of
+        bytes read and header_end is the offset of the blank line ending the
+        headers, or -1 if it was not seen
+    """
+    buffer = conn_buffer.data
+    buffer_view = conn_buffer.view
+    buffer_len = 0
+    while buffer_len < BUFFER_SIZE:
+        n = await loop.sock_recv_into(client_sock, buffer_view[buffer_len:BUFFER_SIZE])
+        if not n:
+            break
+        # Search from just before the new bytes in case the separator straddles reads
+        search_start = max(0, buffer_len - 3)
+        buffer_len += n
+        header_end = buffer.find(b"\r\n\r\n", search_start, buffer_len)
+        if header_end != -1:
+            return buffer_len, header_end
+    return buffer_len, -1
+
+async def _open_stream(client_sock: socket.socket, initial_data: bytes) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    """
+    Wrap a client socket in a StreamReader/StreamWriter pair.
+
+    Args:
+        client_sock: The client socket
+        initial_data: Bytes already read from the socket
+
+    Returns:
+        A tuple of (reader, writer) where the reader yields initial_data first
+    """
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    # Feed the bytes before the transport exists so they stay in order
+    reader.feed_data(initial_data)
+    protocol = asyncio.StreamReaderProtocol(reader)
+    transport, _ = await loop.connect_accepted_socket(lambda: protocol, sock=client_sock)
+    writer = asyncio.StreamWriter(transport, protocol, reader, loop)
+    return reader, writer
+
 async def handle_websocket_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
     """
     Handle a WebSocket connection.
@@ -106,21 +181,50 @@ async def handle_websocket_connection(reader: asyncio.StreamReader, writer: asyn
 
     # Create request object
     req = Request(method, path, headers, "", {}, {})
+    await _serve_websocket(req, reader, writer)
 
+async def _serve_websocket(req: Request, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    """
+    Complete a WebSocket handshake and run the matching route's handler.
+
+    Args:
+        req: The upgrade request
+        reader: The stream reader
+        writer: The stream writer
+    """
     # Find WebSocket route
-    for route in ROUTES:
-        path_params = route.match("WEBSOCKET", path)
-        if path_params is not None:
-            req.path_params = path_params
-            # Handle WebSocket handshake
-            ws_conn = await handle_websocket_handshake(req, writer)
-            if ws_conn:
-                # Call WebSocket handler
-                await route.handler(ws_conn)
-            break
+    found = find_route("WEBSOCKET", req.path)
+    if found is not None:
+        route, req.path_params = found
+        # Handle WebSocket handshake
+        ws_conn = await handle_websocket_handshake(req, writer, reader)
+        if ws_conn:
+            # Call WebSocket handler
+            await route.handler(ws_conn)
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop if it is installed.
+
+    The server only talks to sockets through the loop's sock_* methods, which
+    uvloop implements on top of libuv. The policy only applies to event loops
+    created afterwards, so call this before asyncio.run(run(...)).
+
+    Returns:
+        True if the uvloop policy was installed, False otherwise
+    """
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not available, using the default asyncio event loop")
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    logger.debug("Using the uvloop event loop policy")
+    return True
 
 async def run(host: str = "127.0.0.1", port: int = 8080, ssl_context: ssl.SSLContext = None, 
-              http3_port: Optional[int] = None) -> None:
+              http3_port: Optional[int] = None, sock: Optional[socket.socket] = None) -> None:
     """
     Run the HTTP server.
 
@@ -129,21 +233,30 @@ async def run(host: str = "127.0.0.1", port: int = 8080, ssl_context: ssl.SSLCon
         port: The port to listen on
         ssl_context: Optional SSL context for HTTPS and HTTP/2.0 support
         http3_port: Optional port for HTTP/3 support (requires SSL)
+        sock: Optional already-bound listening socket to serve on instead of
+            binding host and port; the server closes it on shutdown
     """
+    if sock is not None:
+        host, port = sock.getsockname()[:2]
     logger.info(f"Starting HTTPy server on {host}:{port}")
 
-    # Configure server socket
-    server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-
-    try:
-        server_sock.bind((host, port))
-        server_sock.listen(100)
+    if sock is not None:
+        # Serve on the caller's socket, e.g. one inherited from a parent process
+        server_sock = sock
         server_sock.setblocking(False)
-        logger.debug(f"Server socket bound to {host}:{port}")
-    except OSError as e:
-        logger.error(f"Failed to bind to {host}:{port}: {str(e)}")
-        raise
+    else:
+        # Configure server socket
+        server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+        try:
+            server_sock.bind((host, port))
+            server_sock.listen(100)
+            server_sock.setblocking(False)
+            logger.debug(f"Server socket bound to {host}:{port}")
+        except OSError as e:
+            logger.error(f"Failed to bind to {host}:{port}: {str(e)}")
+            raise
 
     # Start HTTP/3 server if requested and available
     http3_server = None
@@ -169,9 +282,14 @@ async def run(host: str = "127.0.0.1", port: int = 8080, ssl_context: ssl.SSLCon
     else:
         logger.info(f"Server running on http://{host}:{port}")
 
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     logger.info("Server started and ready to accept connections")
 
+    # The loop only keeps weak references to tasks. A connection that waits on
+    # a StreamReader is otherwise reachable only through its own reference
+    # cycle and could be garbage collected mid-request.
+    connections = set()
+
     try:
         while True:
             client_sock, client_addr = await loop.sock_accept(server_sock)
@@ -186,12 +304,16 @@ async def run(host: str = "127.0.0.1", port: int = 8080, ssl_context: ssl.SSLCon
                         do_handshake_on_connect=False
                     )
                     ssl_sock.setblocking(False)
-                    loop.create_task(handle_socket(ssl_sock))
+                    task = loop.create_task(handle_socket(ssl_sock))
+                    connections.add(task)
+                    task.add_done_callback(connections.discard)
                 except ssl.SSLError as e:
                     logger.error(f"SSL error: {str(e)}")
                     client_sock.close()
             else:
-                loop.create_task(handle_socket(client_sock))
+                task = loop.create_task(handle_socket(client_sock))
+                connections.add(task)
+                task.add_done_callback(connections.discard)
     except asyncio.CancelledError:
         logger.info("Server shutdown requested")
     except Exception as e:
@@ -6,8 +6,9 @@ HTTP status codes and constants for HTTPy.
 HTTP_STATUS_CODES = {
     200: "OK", 201: "Created", 202: "Accepted", 204: "No Content",
     400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
-    405: "Method Not Allowed", 422: "Unprocessable Entity",
-    500: "Internal Server Error"
+    405: "Method Not Allowed", 413: "Content Too Large", 422: "Unprocessable Entity",
+    431: "Request Header Fields Too Large", 500: "Internal Server Error",
+    501: "Not Implemented"
 }
 
 HTTP_200_OK = 200
@@ -18,5 +19,8 @@ HTTP_401_UNAUTHORIZED = 401
 HTTP_403_FORBIDDEN = 403
 HTTP_404_NOT_FOUND = 404
 HTTP_405_METHOD_NOT_ALLOWED = 405
+HTTP_413_CONTENT_TOO_LARGE = 413
 HTTP_422_UNPROCESSABLE_ENTITY = 422
-HTTP_500_INTERNAL_SERVER_ERROR = 500
\ No newline at end of file
+HTTP_431_REQUEST_HEADER_FIELDS_TOO_LARGE = 431
+HTTP_500_INTERNAL_SERVER_ERROR = 500
+HTTP_501_NOT_IMPLEMENTED = 501
\ No newline at end of file
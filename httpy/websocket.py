@@ -11,6 +11,40 @@ import struct
 from enum import Enum
 from typing import Dict, Any, Optional, Union, Callable, List, Tuple
 
+# GUID appended to the client key when computing Sec-WebSocket-Accept (RFC 6455)
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# Handshake response up to the Sec-WebSocket-Accept value
+HANDSHAKE_RESPONSE_PREFIX = (
+    b"HTTP/1.1 101 Switching Protocols\r\n"
+    b"Upgrade: websocket\r\n"
+    b"Connection: Upgrade\r\n"
+    b"Sec-WebSocket-Accept: "
+)
+
+# The C speedup is optional; it is built by setup.py when a compiler is available
+try:
+    from ._wsmask import apply_mask as _apply_mask_c
+    WSMASK_AVAILABLE = True
+except ImportError:
+    WSMASK_AVAILABLE = False
+
+# NumPy is optional; when installed it is used to unmask large frames
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Payloads at least this large are unmasked with NumPy when it is available
+NUMPY_MASK_THRESHOLD = 1024
+
+# XOR_TABLE[m] maps every byte b to b ^ m, for use with bytes.translate (64 KB in total)
+XOR_TABLE = [bytes(b ^ m for b in range(256)) for m in range(256)]
+
+# Payloads at least this large are unmasked with XOR_TABLE instead of a big-integer XOR
+TRANSLATE_MASK_THRESHOLD = 512
+
 class WebSocketOpCode(Enum):
     """WebSocket operation codes."""
     CONTINUATION = 0x0
@@ -20,6 +54,72 @@ class WebSocketOpCode(Enum):
     PING = 0x9
     PONG = 0xA
 
+def apply_mask(data: bytes, mask: bytes) -> bytes:
+    """
+    Apply a WebSocket masking key to a payload.
+
+    Masking is an XOR with the 4-byte key repeated over the payload, so the
+    same call both masks and unmasks. The XOR is done on the payload as one
+    big integer, which moves the per-byte loop from the interpreter into C.
+    Larger payloads are XORed as 32-bit words with NumPy when it is installed,
+    or otherwise translated through XOR_TABLE one key byte at a time.
+    If the _wsmask C extension has been built it is used for all payloads.
+
+    Args:
+        data: The payload to mask or unmask
+        mask: The 4-byte masking key
+
+    Returns:
+        The masked or unmasked payload
+    """
+    if WSMASK_AVAILABLE:
+        return _apply_mask_c(data, mask)
+    length = len(data)
+    if not length:
+        return b''
+    if NUMPY_AVAILABLE and length >= NUMPY_MASK_THRESHOLD:
+        return _apply_mask_numpy(data, mask, length)
+    if length >= TRANSLATE_MASK_THRESHOLD:
+        return _apply_mask_translate(data, mask)
+    repeated_mask = (mask * ((length >> 2) + 1))[:length]
+    return (int.from_bytes(data, 'big') ^ int.from_bytes(repeated_mask, 'big')).to_bytes(length, 'big')
+
+def _apply_mask_translate(data: bytes, mask: bytes) -> bytes:
+    """
+    Apply a masking key by translating every fourth byte through XOR_TABLE.
+
+    Args:
+        data: The payload to mask or unmask
+        mask: The 4-byte masking key
+
+    Returns:
+        The masked or unmasked payload
+    """
+    result = bytearray(data)
+    for i in range(4):
+        result[i::4] = result[i::4].translate(XOR_TABLE[mask[i]])
+    return bytes(result)
+
+def _apply_mask_numpy(data: bytes, mask: bytes, length: int) -> bytes:
+    """
+    Apply a masking key with NumPy, XORing the payload in place as 32-bit words.
+
+    Args:
+        data: The payload to mask or unmask
+        mask: The 4-byte masking key
+        length: The payload length
+
+    Returns:
+        The masked or unmasked payload
+    """
+    result = bytearray(data)
+    word_end = length & ~3
+    words = np.frombuffer(result, dtype=np.uint32, count=word_end >> 2)
+    np.bitwise_xor(words, np.frombuffer(mask, dtype=np.uint32)[0], out=words)
+    for i in range(word_end, length):
+        result[i] ^= mask[i & 3]
+    return bytes(result)
+
 class WebSocketMessage:
     """Represents a WebSocket message."""
 
@@ -59,6 +159,20 @@ class WebSocketMessage:
         """Check if this is a pong message."""
         return self.opcode == WebSocketOpCode.PONG
 
+    @property
+    def close_code(self) -> Optional[int]:
+        """The status code of a close message, or None if it has none."""
+        if self.opcode != WebSocketOpCode.CLOSE or len(self.data) < 2:
+            return None
+        return struct.unpack('!H', self.data[:2])[0]
+
+    @property
+    def close_reason(self) -> str:
+        """The reason of a close message, decoded only when accessed."""
+        if self.opcode != WebSocketOpCode.CLOSE or len(self.data) <= 2:
+            return ""
+        return self.data[2:].decode('utf-8', errors='replace')
+
     def text(self) -> str:
         """
         Get the message data as text.
@@ -71,7 +185,8 @@ class WebSocketMessage:
 class WebSocketConnection:
     """Represents a WebSocket connection."""
 
-    def __init__(self, client_sock: asyncio.StreamWriter, path: str, headers: Dict[str, str], path_params: Dict[str, str] = None):
+    def __init__(self, client_sock: asyncio.StreamWriter, path: str, headers: Dict[str, str], path_params: Dict[str, str] = None,
+                 reader: Optional[asyncio.StreamReader] = None):
         """
         Initialize a new WebSocket connection.
 
@@ -80,51 +195,54 @@ class WebSocketConnection:
             path: The request path
             headers: The HTTP headers
             path_params: Path parameters extracted from the URL
+            reader: The stream reader for the connection, required to receive messages
         """
         self.writer = client_sock
         self.path = path
         self.headers = headers
         self.path_params = path_params or {}
         self.closed = False
-        self._reader = None  # Will be set when needed
+        self._reader = reader
 
-    async def send(self, message: Union[str, bytes], opcode: Optional[WebSocketOpCode] = None) -> None:
+    async def send(self, message: Union[str, bytes, List[Union[str, bytes]]], opcode: Optional[WebSocketOpCode] = None) -> None:
         """
         Send a message to the client.
 
+        A list of messages is sent as one frame per message with a single write,
+        which saves a write per message when sending many small messages.
+
         Args:
-            message: The message to send
+            message: The message to send, or a list of messages
             opcode: The WebSocket operation code (defaults to TEXT for str, BINARY for bytes)
         """
         if self.closed:
             return
 
-        if opcode is None:
-            opcode = WebSocketOpCode.TEXT if isinstance(message, str) else WebSocketOpCode.BINARY
-
-        if isinstance(message, str):
-            message = message.encode('utf-8')
-
-        # Create the frame header
-        header = bytearray()
-
-        # First byte: FIN bit (1) + RSV bits (000) + opcode (4 bits)
-        header.append(0x80 | opcode.value)
-
-        # Second byte: MASK bit (0) + payload length
-        length = len(message)
-        if length < 126:
-            header.append(length)
-        elif length < 65536:
-            header.append(126)
-            header.extend(struct.pack('!H', length))
-        else:
-            header.append(127)
-            header.extend(struct.pack('!Q', length))
+        messages = message if isinstance(message, list) else (message,)
+        buffers = []
+        for message in messages:
+            frame_opcode = opcode
+            if frame_opcode is None:
+                frame_opcode = WebSocketOpCode.TEXT if isinstance(message, str) else WebSocketOpCode.BINARY
+
+            if isinstance(message, str):
+                message = message.encode('utf-8')
+
+            # Create the frame header in one go
+            # First byte: FIN bit (1) + RSV bits (000) + opcode (4 bits)
+            # Second byte: MASK bit (0) + payload length, extended for larger payloads
+            first_byte = 0x80 | frame_opcode.value
+            length = len(message)
+            if length < 126:
+                buffers.append(bytes((first_byte, length)))
+            elif length < 65536:
+                buffers.append(struct.pack('!BBH', first_byte, 126, length))
+            else:
+                buffers.append(struct.pack('!BBQ', first_byte, 127, length))
+            buffers.append(message)
 
-        # Write the header and payload
-        self.writer.write(header)
-        self.writer.write(message)
+        # Write the headers and payloads together, without copying the payloads
+        self.writer.writelines(buffers)
         await self.writer.drain()
 
     async def send_text(self, message: str) -> None:
@@ -145,13 +263,13 @@ class WebSocketConnection:
         """
         await self.send(message, WebSocketOpCode.BINARY)
 
-    async def close(self, code: int = 1000, reason: str = "") -> None:
+    async def close(self, code: int = 1000, reason: Union[str, bytes] = "") -> None:
         """
         Close the WebSocket connection.
 
         Args:
             code: The close code
-            reason: The close reason
+            reason: The close reason, as text or already UTF-8 encoded
         """
         if self.closed:
             return
@@ -159,7 +277,7 @@ class WebSocketConnection:
         # Create close frame payload
         payload = struct.pack('!H', code)
         if reason:
-            payload += reason.encode('utf-8')
+            payload += reason.encode('utf-8') if isinstance(reason, str) else reason
 
         # Send close frame
         await self.send(payload, WebSocketOpCode.CLOSE)
@@ -185,10 +303,29 @@ class WebSocketConnection:
         """
         await self.send(data, WebSocketOpCode.PONG)
 
-    async def receive(self) -> WebSocketMessage:
+    async def receive(self, wait_for_data_frame: bool = False) -> WebSocketMessage:
         """
         Receive a message from the client.
 
+        Args:
+            wait_for_data_frame: If True, pings and pongs are handled without
+                being returned, and only data frames or a close frame are returned
+
+        Returns:
+            A WebSocketMessage object
+
+        Raises:
+            ConnectionError: If the connection is closed
+        """
+        while True:
+            message = await self._receive_frame()
+            if not wait_for_data_frame or message.opcode not in (WebSocketOpCode.PING, WebSocketOpCode.PONG):
+                return message
+
+    async def _receive_frame(self) -> WebSocketMessage:
+        """
+        Receive a single frame from the client, answering pings and close frames.
+
         Returns:
             A WebSocketMessage object
 
@@ -198,14 +335,8 @@ class WebSocketConnection:
         if self.closed:
             raise ConnectionError("WebSocket connection is closed")
 
-        # Create a reader from the writer's transport if not already created
         if self._reader is None:
-            transport = self.writer.transport
-            self._reader = asyncio.StreamReader()
-            protocol = asyncio.StreamReaderProtocol(self._reader)
-            await asyncio.get_event_loop().connect_accepted_socket(
-                lambda: protocol, transport.get_extra_info('socket')
-            )
+            raise ConnectionError("WebSocket connection has no reader")
 
         # Read the header (2 bytes minimum)
         header = await self._reader.readexactly(2)
@@ -230,22 +361,17 @@ class WebSocketConnection:
 
         # Unmask payload if needed
         if masked:
-            unmasked = bytearray(payload_length)
-            for i in range(payload_length):
-                unmasked[i] = payload[i] ^ mask[i % 4]
-            payload = bytes(unmasked)
+            payload = apply_mask(payload, mask)
 
         # Handle control frames
         if opcode == WebSocketOpCode.PING:
             # Automatically respond to pings
             await self.pong(payload)
         elif opcode == WebSocketOpCode.CLOSE:
-            # Parse close code and reason
+            # Echo the close frame, passing the reason through undecoded
             if len(payload) >= 2:
                 code = struct.unpack('!H', payload[:2])[0]
-                reason = payload[2:].decode('utf-8', errors='replace') if len(payload) > 2 else ""
-                # Echo the close frame
-                await self.close(code, reason)
+                await self.close(code, payload[2:])
             else:
                 # No code provided, use default
                 await self.close()
@@ -253,13 +379,15 @@ class WebSocketConnection:
         # Return the message
         return WebSocketMessage(opcode, payload)
 
-async def handle_websocket_handshake(request, client_sock: asyncio.StreamWriter) -> Optional[WebSocketConnection]:
+async def handle_websocket_handshake(request, client_sock: asyncio.StreamWriter,
+                                     reader: Optional[asyncio.StreamReader] = None) -> Optional[WebSocketConnection]:
     """
     Handle a WebSocket handshake request.
 
     Args:
         request: The HTTP request
         client_sock: The client socket
+        reader: The stream reader the request was read from
 
     Returns:
         A WebSocketConnection if the handshake was successful, None otherwise
@@ -279,23 +407,14 @@ async def handle_websocket_handshake(request, client_sock: asyncio.StreamWriter)
 
     # Calculate the Sec-WebSocket-Accept header
     key = request.headers['Sec-WebSocket-Key']
-    accept = base64.b64encode(
-        hashlib.sha1(f"{key}258EAFA5-E914-47DA-95CA-C5AB0DC85B11".encode()).digest()
-    ).decode()
+    accept = base64.b64encode(hashlib.sha1(key.encode('latin1') + WEBSOCKET_GUID).digest())
 
     # Send the handshake response
-    response = (
-        "HTTP/1.1 101 Switching Protocols\r\n"
-        "Upgrade: websocket\r\n"
-        "Connection: Upgrade\r\n"
-        f"Sec-WebSocket-Accept: {accept}\r\n"
-        "\r\n"
-    )
-    client_sock.write(response.encode())
+    client_sock.write(HANDSHAKE_RESPONSE_PREFIX + accept + b"\r\n\r\n")
     await client_sock.drain()
 
     # Create and return the WebSocket connection
-    return WebSocketConnection(client_sock, request.path, request.headers, request.path_params)
+    return WebSocketConnection(client_sock, request.path, request.headers, request.path_params, reader)
 
 def websocket(path: str) -> Callable:
     """
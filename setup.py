@@ -1,9 +1,22 @@
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
+
+# Optional C speedup for WebSocket masking; the pure-Python path is used if it fails to build
+wsmask = Extension("httpy._wsmask", sources=["httpy/_wsmask.c"], optional=True)
+
+# Optional C parser for HTTP/1.1 request heads, with the same pure-Python fallback
+http1parse = Extension("httpy._http1parse", sources=["httpy/_http1parse.c"], optional=True)
 
 setup(
     name="httpy",
     version="0.0.1",
     packages=find_packages(),
+    ext_modules=[wsmask, http1parse],
+    extras_require={
+        # Faster event loop, enabled with httpy.install_uvloop()
+        "uvloop": ["uvloop; sys_platform != 'win32'"],
+        # Faster JSON parsing for Request.json()
+        "orjson": ["orjson"],
+    },
     description="A simple, intuitive HTTP server library for Python",
     long_description=open("README.md").read(),
     long_description_content_type="text/markdown",
@@ -0,0 +1,72 @@
+"""
+Route handlers used by the cross-platform tests.
+
+The handlers are plain coroutines so the tests can await them in-process;
+the subprocess test server registers them as routes.
+"""
+
+import os
+import platform
+
+from httpy import Request, Response
+
+
+async def platform_info(req: Request) -> Response:
+    info = {
+        "system": platform.system(),
+        "release": platform.release(),
+        "version": platform.version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "python_implementation": platform.python_implementation(),
+        "python_version": platform.python_version(),
+    }
+    return Response.json(info)
+
+
+async def filesystem_info(req: Request) -> Response:
+    # Get platform-specific paths
+    if platform.system() == "Windows":
+        root_dir = "C:\\"
+        temp_dir = os.environ.get("TEMP", "C:\\Windows\\Temp")
+    else:  # Unix-like (Linux, macOS)
+        root_dir = "/"
+        temp_dir = "/tmp"
+
+    # Check if directories exist
+    info = {
+        "root_exists": os.path.exists(root_dir),
+        "temp_exists": os.path.exists(temp_dir),
+        "root_dir": root_dir,
+        "temp_dir": temp_dir,
+        "cwd": os.getcwd(),
+    }
+    return Response.json(info)
+
+
+async def environment_info(req: Request) -> Response:
+    # Get common environment variables
+    common_vars = ["PATH", "HOME", "USER", "TEMP", "TMP"]
+    env_info = {}
+
+    for var in common_vars:
+        if var in os.environ:
+            # Truncate long values to avoid excessive output
+            value = os.environ[var]
+            if len(value) > 100:
+                value = value[:100] + "..."
+            env_info[var] = value
+
+    return Response.json(env_info)
+
+
+async def encoding_info(req: Request) -> Response:
+    # Test various character encodings
+    encodings = {
+        "ascii": "Hello, World!",
+        "utf8": "Hello, 世界! Привет, мир! 👋",
+        "emoji": "😀 🚀 🐍 🔥",
+        "special": "\n\t\r\b\f",
+    }
+
+    return Response.json(encodings)
@@ -0,0 +1,30 @@
+"""
+Shared pytest configuration for the HTTPy tests.
+"""
+
+import asyncio
+import os
+import sys
+
+# Add the parent directory to the path so the tests can import the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+
+from httpy import routing
+
+
+@pytest.fixture(autouse=True)
+def isolate_routes(monkeypatch):
+    """Give every test its own empty routing table."""
+    monkeypatch.setattr(routing, "ROUTES", routing.RouteList())
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_asyncio_loop_factories(config, item):
+    """Run the pytest-asyncio tests on uvloop when it is installed."""
+    try:
+        import uvloop
+    except ImportError:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
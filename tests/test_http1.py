@@ -3,62 +3,51 @@
 Unit tests for the HTTPy HTTP/1.1 functionality.
 """
 
-import sys
 import os
 import unittest
 import asyncio
 import socket
 from unittest.mock import patch, MagicMock, AsyncMock
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from httpy import Request, Response, get
-from httpy.routing import ROUTES
-from httpy.http1 import handle_http1_connection, handle_http1_request
+from httpy import routing
+from httpy.headers import CIDict
+from httpy.http1 import (
+    handle_http1_connection, handle_http1_request, _sock_sendmsg, _parse_head, ConnectionBuffer,
+    BUFFER_SIZE, MAX_RETAINED_BUFFER_SIZE, MAX_HEAD_SIZE, MAX_BODY_SIZE, HTTP1PARSE_AVAILABLE
+)
+
+if HTTP1PARSE_AVAILABLE:
+    from httpy._http1parse import parse_head as parse_head_c
+
+# Wire-format requests shared by the tests
+GET_REQUEST = b"GET /test HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n"
+BINARY_BODY = b'\x00\x01\x02\x03\x04\xFF\xFE\xFD\xFC\xFB'
+BINARY_POST_REQUEST = (
+    b"POST /echo HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/octet-stream\r\n"
+    b"Content-Length: %d\r\n\r\n" % len(BINARY_BODY)
+) + BINARY_BODY
 
 
 class TestHTTP1(unittest.IsolatedAsyncioTestCase):
     """Tests for the HTTP/1.1 functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Clear the global ROUTES list before each test
-        ROUTES.clear()
+    def request_socket(self, data):
+        """Return the server end of a socketpair whose peer sent data and closed."""
+        server_sock, client_sock = socket.socketpair()
+        self.addCleanup(server_sock.close)
+        client_sock.sendall(data)
+        client_sock.close()
+        server_sock.setblocking(False)
+        return server_sock
 
-    @patch('asyncio.get_event_loop')
-    async def test_handle_http1_request(self, mock_get_loop):
+    async def test_handle_http1_request(self):
         """Test handle_http1_request function."""
-        # Set up mocks
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
-
-        # Mock socket
-        mock_socket = MagicMock()
-
-        # Mock reader and writer
-        mock_reader = AsyncMock()
-        mock_writer = AsyncMock()
-
-        # Mock sock_recv_into to simulate receiving HTTP request data
-        # We'll use a side effect function to control the behavior
-        call_count = 0
-        def sock_recv_into_side_effect(sock, buffer_view):
-            nonlocal call_count
-            if call_count == 0:
-                # First call: write the request data into the buffer
-                data = b"GET /test HTTP/1.1\r\nHost: localhost\r\nConnection: keep-alive\r\n\r\n"
-                buffer_view[:len(data)] = data
-                call_count += 1
-                return len(data)
-            else:
-                # Subsequent calls: return 0 to indicate end of data
-                return 0
-
-        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+        loop = asyncio.get_running_loop()
+        sock = self.request_socket(GET_REQUEST)
 
         # Call handle_http1_request
-        keep_alive, req = await handle_http1_request(mock_loop, mock_socket, mock_reader, mock_writer)
+        keep_alive, req = await handle_http1_request(loop, sock, AsyncMock(), AsyncMock())
 
         # Check that the request was parsed correctly
         self.assertTrue(keep_alive)
@@ -67,53 +56,233 @@ class TestHTTP1(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(req.headers["Host"], "localhost")
         self.assertEqual(req.headers["Connection"], "keep-alive")
 
-    @patch('asyncio.get_event_loop')
-    async def test_handle_http1_post_request_with_binary_data(self, mock_get_loop):
-        """Test handle_http1_request function with POST and binary data."""
-        # Set up mocks
-        mock_loop = AsyncMock()
-        mock_get_loop.return_value = mock_loop
+    async def test_handle_http1_request_keep_alive_defaults(self):
+        """Test keep-alive defaults for HTTP/1.0 and HTTP/1.1 requests."""
+        cases = [
+            (b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n", True),
+            (b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n", False),
+            (b"GET / HTTP/1.0\r\nHost: localhost\r\n\r\n", False),
+            (b"GET / HTTP/1.0\r\nConnection: Keep-Alive\r\n\r\n", True),
+            # The header is a case-insensitive token list
+            (b"GET / HTTP/1.1\r\nconnection: Upgrade, Close\r\n\r\n", False),
+            (b"GET / HTTP/1.0\r\nConnection: TE, keep-alive\r\n\r\n", True),
+        ]
+        for data, expected in cases:
+            mock_loop = AsyncMock()
+
+            def sock_recv_into_side_effect(sock, buffer_view, data=data):
+                buffer_view[:len(data)] = data
+                return len(data)
 
-        # Mock socket
-        mock_socket = MagicMock()
+            mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+            keep_alive, req = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+            self.assertEqual(keep_alive, expected, data)
+
+    async def test_handle_http1_request_line_parsing(self):
+        """Test request lines on the fast path, the regex fallback and invalid ones."""
+        cases = [
+            (b"PATCH /items/1?x=y HTTP/1.1\r\n\r\n", ("PATCH", "/items/1", True)),
+            (b"GET /old HTTP/1.0\r\n\r\n", ("GET", "/old", False)),
+            (b"GET  /spaced\tHTTP/1.1\r\n\r\n", ("GET", "/spaced", True)),
+            (b"GET /next HTTP/2.0\r\n\r\n", ("GET", "/next", False)),
+        ]
+        for data, (method, path, expected_keep_alive) in cases:
+            mock_loop = AsyncMock()
+
+            def sock_recv_into_side_effect(sock, buffer_view, data=data):
+                buffer_view[:len(data)] = data
+                return len(data)
 
-        # Mock reader and writer
-        mock_reader = AsyncMock()
-        mock_writer = AsyncMock()
+            mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+            keep_alive, req = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+            self.assertEqual((req.method, req.path, keep_alive), (method, path, expected_keep_alive), data)
 
-        # Create binary data for the request body
-        binary_data = b'\x00\x01\x02\x03\x04\xFF\xFE\xFD\xFC\xFB'
-        content_length = len(binary_data)
+        for data in (b"get / HTTP/1.1\r\n\r\n", b"GET  HTTP/1.1\r\n\r\n", b"GET /\r\n\r\n"):
+            mock_loop = AsyncMock()
 
-        # Mock sock_recv_into to simulate receiving HTTP request data with binary body
-        call_count = 0
-        def sock_recv_into_side_effect(sock, buffer_view):
-            nonlocal call_count
-            if call_count == 0:
-                # First call: write the request headers into the buffer
-                headers = f"POST /echo HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/octet-stream\r\nContent-Length: {content_length}\r\n\r\n"
-                data = headers.encode('ascii') + binary_data
+            def sock_recv_into_side_effect(sock, buffer_view, data=data):
                 buffer_view[:len(data)] = data
-                call_count += 1
                 return len(data)
-            else:
-                # Subsequent calls: return 0 to indicate end of data
-                return 0
+
+            mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+            with self.assertRaises(ValueError, msg=data):
+                await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+    async def test_handle_http1_request_header_parsing(self):
+        """Test parsing of header lines with and without whitespace around values."""
+        data = (b"GET / HTTP/1.1\r\nHost:localhost\r\nX-Spaced:   value  \r\n"
+                b"X-Time: 12:30\r\nNo-Colon\r\n: no-name\r\n\r\n")
+        mock_loop = AsyncMock()
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            buffer_view[:len(data)] = data
+            return len(data)
 
         mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+        _, req = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+        self.assertEqual(req.headers, {"Host": "localhost", "X-Spaced": "value", "X-Time": "12:30"})
+
+    async def test_handle_http1_request_rejects_bare_newline_in_header(self):
+        """Test that a bare newline inside a header value is rejected."""
+        data = b"GET / HTTP/1.1\r\nX-Bad: a\nInjected: b\r\n\r\n"
+        mock_loop = AsyncMock()
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            buffer_view[:len(data)] = data
+            return len(data)
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+        with self.assertRaises(ValueError):
+            await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+    async def test_handle_http1_request_split_across_reads(self):
+        """Test requests whose headers and body arrive over several reads."""
+        body = b"x" * 20000
+        data = (b"POST /upload HTTP/1.1\r\nX-Large: " + b"a" * 10000 +
+                b"\r\nContent-Length: 20000\r\n\r\n" + body)
+        chunks = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+        mock_loop = AsyncMock()
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            chunk = chunks.pop(0)
+            size = min(len(chunk), len(buffer_view))
+            buffer_view[:size] = chunk[:size]
+            if size < len(chunk):
+                chunks.insert(0, chunk[size:])
+            return size
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+        keep_alive, req = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+        self.assertTrue(keep_alive)
+        self.assertEqual(req.path, "/upload")
+        self.assertEqual(len(req.headers["X-Large"]), 10000)
+        self.assertEqual(req.body, body)
+        self.assertEqual(chunks, [])
+
+    async def test_handle_http1_request_reuses_request(self):
+        """Test that a recycled request object is reset in place."""
+        requests = [
+            b"GET /first?a=1 HTTP/1.1\r\nX-First: 1\r\n\r\n",
+            b"GET /second HTTP/1.1\r\nX-Second: 2\r\n\r\n",
+        ]
+        mock_loop = AsyncMock()
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            data = requests.pop(0)
+            buffer_view[:len(data)] = data
+            return len(data)
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+
+        _, first = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+        first.path_params["id"] = "1"
+        _, second = await handle_http1_request(mock_loop, MagicMock(), AsyncMock(), AsyncMock(), None, first)
+
+        self.assertIs(second, first)
+        self.assertEqual(second.path, "/second")
+        self.assertEqual(second.headers, {"X-Second": "2"})
+        self.assertEqual(second.path_params, {})
+        self.assertEqual(second.query_params, {})
+
+    async def test_handle_http1_request_reuses_connection_buffer(self):
+        """Test that requests share the connection buffer and a large one is released."""
+        body = b"x" * (MAX_RETAINED_BUFFER_SIZE + 1)
+        requests = [
+            b"GET /first HTTP/1.1\r\nX-Long: " + b"a" * 100 + b"\r\n\r\n",
+            b"GET /second HTTP/1.1\r\n\r\n",
+            b"POST /upload HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body,
+        ]
+        mock_loop = AsyncMock()
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            data = requests[0]
+            size = min(len(data), len(buffer_view))
+            buffer_view[:size] = data[:size]
+            requests[0] = data[size:]
+            if not requests[0]:
+                requests.pop(0)
+            return size
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+        conn_buffer = ConnectionBuffer()
+        data = conn_buffer.data
+
+        _, req = await handle_http1_request(mock_loop, MagicMock(), None, None, None, None, conn_buffer)
+        self.assertEqual(len(req.headers["X-Long"]), 100)
+        _, req = await handle_http1_request(mock_loop, MagicMock(), None, None, None, None, conn_buffer)
+        # Stale bytes from the longer first request don't leak into the second
+        self.assertEqual((req.path, req.headers, req.body), ("/second", {}, b""))
+        self.assertIs(conn_buffer.data, data)
+
+        _, req = await handle_http1_request(mock_loop, MagicMock(), None, None, None, None, conn_buffer)
+        self.assertEqual(req.body, body)
+        self.assertEqual(len(conn_buffer.data), BUFFER_SIZE)
+
+    async def test_handle_http1_connection_pools_state(self):
+        """Test that a new connection reuses the buffer and Request of a closed one."""
+        loop = asyncio.get_running_loop()
+        seen = []
+
+        async def test_handler(req):
+            seen.append(req)
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/test", test_handler))
+
+        with patch('httpy.http1._BUFFER_POOL', []) as buffers, patch('httpy.http1._REQUEST_POOL', []) as requests:
+            await handle_http1_connection(loop, self.request_socket(GET_REQUEST), None, None)
+            self.assertEqual((len(buffers), requests), (1, seen))
+            pooled_buffer = buffers[0]
+
+            await handle_http1_connection(loop, self.request_socket(GET_REQUEST), None, None)
+            self.assertIs(seen[1], seen[0])
+            self.assertEqual(buffers, [pooled_buffer])
+
+    async def test_handle_http1_connection_peeked_buffer(self):
+        """Test that bytes a caller peeked into the connection buffer are parsed in place."""
+        loop = asyncio.get_running_loop()
+        seen = []
+
+        async def test_handler(req):
+            seen.append(req.path)
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/test", test_handler))
+
+        # Leading empty lines are skipped before the first request too
+        for peeked in (GET_REQUEST, b"\r\n" + GET_REQUEST):
+            with self.subTest(peeked=peeked), patch('httpy.http1._BUFFER_POOL', []) as buffers:
+                seen.clear()
+                conn_buffer = ConnectionBuffer()
+                conn_buffer.data[:len(peeked)] = peeked
+                pending = bytearray()
+                sock = self.request_socket(GET_REQUEST)
+                await handle_http1_connection(loop, sock, None, None, pending, conn_buffer, len(peeked))
+
+                self.assertEqual(seen, ["/test", "/test"])
+                self.assertEqual(buffers, [conn_buffer])
+
+    async def test_handle_http1_post_request_with_binary_data(self):
+        """Test handle_http1_request function with POST and binary data."""
+        loop = asyncio.get_running_loop()
+        sock = self.request_socket(BINARY_POST_REQUEST)
 
         # Call handle_http1_request
-        keep_alive, req = await handle_http1_request(mock_loop, mock_socket, mock_reader, mock_writer)
+        keep_alive, req = await handle_http1_request(loop, sock, AsyncMock(), AsyncMock())
 
         # Check that the request was parsed correctly
         self.assertEqual(req.method, "POST")
         self.assertEqual(req.path, "/echo")
         self.assertEqual(req.headers["Host"], "localhost")
         self.assertEqual(req.headers["Content-Type"], "application/octet-stream")
-        self.assertEqual(req.headers["Content-Length"], str(content_length))
+        self.assertEqual(req.headers["Content-Length"], str(len(BINARY_BODY)))
 
         # Check that the binary body was preserved
-        self.assertEqual(req.body, binary_data)
+        self.assertEqual(req.body, BINARY_BODY)
         self.assertTrue(isinstance(req.body, bytes))
 
     @patch('asyncio.get_event_loop')
@@ -130,39 +299,311 @@ class TestHTTP1(unittest.IsolatedAsyncioTestCase):
         mock_reader = AsyncMock()
         mock_writer = AsyncMock()
 
-        # Mock handle_http1_request to return a request
+        # Mock handle_http1_request to return a run of keep-alive requests
+        request_count = 100
+        req = Request("GET", "/test", {"Host": "localhost"}, "", {}, {})
         with patch('httpy.http1.handle_http1_request') as mock_handle_request:
-            # First call returns a request, second call returns (False, None) to end the loop
-            mock_handle_request.side_effect = [
-                (True, Request("GET", "/test", {"Host": "localhost"}, "", {}, {})),
-                (False, None)
-            ]
-
-            # Clear the ROUTES list and set up a test route
-            ROUTES.clear()
+            # The last call returns (False, None) to end the loop
+            mock_handle_request.side_effect = [(True, req)] * request_count + [(False, None)]
 
+            # Set up a test route
             # Create a Route object directly instead of using the decorator
             async def test_handler(req):
                 return Response.text("Test Response")
 
             from httpy.routing import Route
-            ROUTES.append(Route("GET", "/test", test_handler))
+            routing.ROUTES.append(Route("GET", "/test", test_handler))
 
             # Call handle_http1_connection
             await handle_http1_connection(mock_loop, mock_socket, mock_reader, mock_writer)
 
-            # Check that handle_http1_request was called
-            self.assertEqual(mock_handle_request.call_count, 2)
+            # Check that handle_http1_request was called once per request plus the final read
+            self.assertEqual(mock_handle_request.call_count, request_count + 1)
+
+            # Check that every request on the connection got its own response
+            self.assertEqual(mock_loop.sock_sendall.call_count, request_count)
+
+            # The pending-bytes buffer is shared by every read on the connection,
+            # and the parsed request is handed back to be recycled
+            calls = mock_handle_request.call_args_list
+            self.assertEqual(len({id(call.args[4]) for call in calls}), 1)
+            self.assertIsNone(calls[0].args[5])
+            for call in calls[1:]:
+                self.assertIs(call.args[5], req)
 
-            # Check that sock_sendall was called with a response
-            mock_loop.sock_sendall.assert_called()
             # Get the bytes that were sent
             sent_bytes = mock_loop.sock_sendall.call_args[0][1]
-            sent_text = sent_bytes.decode('utf-8')
 
             # Check that the response contains the expected content
-            self.assertIn("HTTP/1.1 200 OK", sent_text)
-            self.assertIn("Test Response", sent_text)
+            self.assertIn(b"HTTP/1.1 200 OK", sent_bytes)
+            self.assertIn(b"Connection: keep-alive", sent_bytes)
+            self.assertIn(b"Test Response", sent_bytes)
+
+    async def test_handle_http1_connection_pipelined(self):
+        """Test that pipelined requests are answered with a single send."""
+        mock_loop = AsyncMock()
+        data = (
+            b"GET /test HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /test HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            b"GET /test HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+        )
+        sent = False
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            nonlocal sent
+            if sent:
+                return 0
+            sent = True
+            buffer_view[:len(data)] = data
+            return len(data)
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+
+        async def test_handler(req):
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/test", test_handler))
+
+        await handle_http1_connection(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+        # All three responses go out in one send call
+        self.assertEqual(mock_loop.sock_recv_into.call_count, 1)
+        self.assertEqual(mock_loop.sock_sendall.call_count, 1)
+        sent_bytes = mock_loop.sock_sendall.call_args[0][1]
+        self.assertEqual(sent_bytes.count(b"HTTP/1.1 200 OK"), 3)
+        self.assertTrue(sent_bytes.endswith(b"Connection: close\r\n\r\nTest Response"))
+
+    async def test_handle_http1_connection_request_too_large(self):
+        """Test that oversized heads and bodies and malformed lengths are refused and the connection closed."""
+        cases = [
+            # Header bytes that never end the head
+            (b"GET / HTTP/1.1\r\nX: " + b"a" * (2 * MAX_HEAD_SIZE), b"HTTP/1.1 431 Request Header Fields Too Large\r\n"),
+            # A body over the limit is refused before it is read
+            (b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (MAX_BODY_SIZE + 1), b"HTTP/1.1 413 Content Too Large\r\n"),
+            (b"POST / HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % (10 ** 30), b"HTTP/1.1 413 Content Too Large\r\n"),
+            # Lengths int() accepts but that are not plain digits are refused on the same path
+            (b"POST / HTTP/1.1\r\nContent-Length: -1\r\n\r\n", b"HTTP/1.1 400 Bad Request\r\n"),
+            (b"POST / HTTP/1.1\r\nContent-Length: +5\r\n\r\nhello", b"HTTP/1.1 400 Bad Request\r\n"),
+            (b"POST / HTTP/1.1\r\nContent-Length: 1_0\r\n\r\n0123456789", b"HTTP/1.1 400 Bad Request\r\n"),
+        ]
+        for data, status_line in cases:
+            with self.subTest(status_line=status_line):
+                mock_loop = AsyncMock()
+                offset = 0
+
+                def sock_recv_into_side_effect(sock, buffer_view):
+                    nonlocal offset
+                    n = min(len(buffer_view), len(data) - offset)
+                    buffer_view[:n] = data[offset:offset + n]
+                    offset += n
+                    return n
+
+                mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+                await handle_http1_connection(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+                self.assertLessEqual(offset, MAX_HEAD_SIZE)
+                self.assertEqual(mock_loop.sock_sendall.call_count, 1)
+                sent_bytes = mock_loop.sock_sendall.call_args[0][1]
+                self.assertTrue(sent_bytes.startswith(status_line))
+                self.assertIn(b"Connection: close\r\n", sent_bytes)
+
+    async def test_handle_http1_connection_bad_framing(self):
+        """Test that requests whose body length is unsupported or ambiguous are refused."""
+        calls = []
+
+        async def test_handler(req):
+            calls.append(req.path)
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/public", test_handler))
+        routing.ROUTES.append(Route("GET", "/admin", test_handler))
+
+        bad_request = b"HTTP/1.1 400 Bad Request\r\n"
+        cases = [
+            # A negative length would rewind into the head and replay its end as a request
+            (b"GET /public HTTP/1.1\r\nHost: a\r\nGET /admin HTTP/1.1\r\nContent-Length: -44\r\n\r\n", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: +5\r\n\r\nhello", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: 1_0\r\n\r\n0123456789", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: \xd9\xa1\r\n\r\nx", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: 5, 5\r\n\r\nhello", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: \r\n\r\n", bad_request),
+            # Chunked bodies are not decoded, so they would parse as more requests
+            (b"GET /public HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\n"
+             b"1e\r\nGET /admin HTTP/1.1\r\nHost: a\r\n\r\n\r\n0\r\n\r\n", b"HTTP/1.1 501 Not Implemented\r\n"),
+            (b"GET /public HTTP/1.1\r\ntransfer-encoding: chunked\r\nContent-Length: 3\r\n\r\n0\r\n\r\n", bad_request),
+            (b"GET /public HTTP/1.1\r\nContent-Length: 0\r\ncontent-LENGTH: 40\r\n\r\n"
+             b"GET /admin HTTP/1.1\r\nHost: a\r\n\r\n", bad_request),
+        ]
+        for data, status_line in cases:
+            with self.subTest(data=data):
+                calls.clear()
+                mock_loop = AsyncMock()
+                chunks = [data]
+
+                def sock_recv_into_side_effect(sock, buffer_view):
+                    if not chunks:
+                        return 0
+                    chunk = chunks.pop()
+                    buffer_view[:len(chunk)] = chunk
+                    return len(chunk)
+
+                mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+                await handle_http1_connection(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+                self.assertEqual(calls, [])
+                self.assertEqual(mock_loop.sock_sendall.call_count, 1)
+                sent_bytes = mock_loop.sock_sendall.call_args[0][1]
+                self.assertTrue(sent_bytes.startswith(status_line))
+                self.assertIn(b"Connection: close\r\n", sent_bytes)
+
+        # Repeated headers that agree are accepted
+        loop = asyncio.get_running_loop()
+        sock = self.request_socket(b"POST / HTTP/1.1\r\nContent-Length: 5\r\nContent-Length: 5\r\n\r\nhello")
+        keep_alive, req = await handle_http1_request(loop, sock, AsyncMock(), AsyncMock())
+        self.assertEqual(req.body, b"hello")
+
+    async def test_handle_http1_connection_head_json(self):
+        """Test that a HEAD request to a JSON route gets no body."""
+        mock_loop = AsyncMock()
+        data = b"HEAD /data HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n"
+
+        def sock_recv_into_side_effect(sock, buffer_view):
+            buffer_view[:len(data)] = data
+            return len(data)
+
+        mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+
+        async def test_handler(req):
+            return Response.json({"a": 1})
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("HEAD", "/data", test_handler))
+
+        await handle_http1_connection(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+        sent_bytes = mock_loop.sock_sendall.call_args[0][1]
+        self.assertIn(b"Content-Length: 0\r\n", sent_bytes)
+        self.assertTrue(sent_bytes.endswith(b"\r\n\r\n"))
+
+    async def test_handle_http1_connection_pipelined_partial(self):
+        """Test that responses are sent before reading the rest of a pipelined request."""
+        cases = [
+            # The first bytes of the next request arrive with the first one
+            (b"GET /test HTTP/1.1\r\nHost: localhost\r\n\r\nGET /test HTTP/1.1\r\nHo",
+             b"st: localhost\r\nConnection: close\r\n\r\n"),
+            # A CRLF after the body is skipped rather than held as a request
+            (b"POST /test HTTP/1.1\r\nContent-Length: 3\r\n\r\nabc\r\n",
+             b"GET /test HTTP/1.1\r\nConnection: close\r\n\r\n"),
+        ]
+
+        async def test_handler(req):
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/test", test_handler))
+        routing.ROUTES.append(Route("POST", "/test", test_handler))
+
+        for chunks in cases:
+            with self.subTest(chunks=chunks):
+                mock_loop = AsyncMock()
+                remaining = list(chunks)
+
+                def sock_recv_into_side_effect(sock, buffer_view):
+                    if not remaining:
+                        return 0
+                    if len(remaining) < len(chunks):
+                        # The first response must be out before waiting on the client
+                        self.assertEqual(mock_loop.sock_sendall.call_count, 1)
+                    chunk = remaining.pop(0)
+                    buffer_view[:len(chunk)] = chunk
+                    return len(chunk)
+
+                mock_loop.sock_recv_into.side_effect = sock_recv_into_side_effect
+                await handle_http1_connection(mock_loop, MagicMock(), AsyncMock(), AsyncMock())
+
+                self.assertEqual(mock_loop.sock_sendall.call_count, 2)
+                for call in mock_loop.sock_sendall.call_args_list:
+                    self.assertTrue(call[0][1].startswith(b"HTTP/1.1 200 OK\r\n"))
+
+    async def test_handle_http1_connection_websocket_upgrade(self):
+        """Test that a WebSocket upgrade after a kept-alive request is handed back."""
+        loop = asyncio.get_running_loop()
+        upgrade = (
+            b"GET /ws HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+            b"Connection: Upgrade\r\n\r\n"
+        )
+        frame = b"\x81\x85"  # Start of the first client frame
+        sock = self.request_socket(GET_REQUEST + upgrade + frame)
+
+        async def test_handler(req):
+            return Response.text("Test Response")
+
+        from httpy.routing import Route
+        routing.ROUTES.append(Route("GET", "/test", test_handler))
+
+        pending = bytearray()
+        req = await handle_http1_connection(loop, sock, None, None, pending)
+
+        # The upgrade request is returned with the bytes that followed it
+        self.assertEqual(req.path, "/ws")
+        self.assertEqual(req.headers["Upgrade"], "websocket")
+        self.assertEqual(pending, frame)
+
+    @unittest.skipUnless(HTTP1PARSE_AVAILABLE, "_http1parse extension not built")
+    def test_parse_head_c(self):
+        """Test that the C parser matches the Python parser or defers to it."""
+        heads = [
+            GET_REQUEST,
+            b"POST /a?b=c HTTP/1.0\r\nX:  padded \xa0\r\nbad line\r\n:no-name\r\nDup: 1\r\nDup: 2\r\n\r\n",
+            b"GET / HTTP/1.1\r\nCONTENT-length: 0\r\n\xc0\xd7\xdf-Name: x\r\n\r\n",
+            b"GET /only-request-line HTTP/1.1\r\n\r\n",
+            b"GET /bad HTTP/1.1\r\nX: a\rb\r\n\r\n",
+        ]
+        for data in heads:
+            buffer = bytearray(data)
+            header_end = buffer.find(b"\r\n\r\n")
+            expected_headers = CIDict()
+            try:
+                expected = _parse_head(buffer, header_end, expected_headers)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    parse_head_c(buffer, header_end, CIDict())
+                continue
+            headers = CIDict()
+            self.assertEqual(parse_head_c(buffer, header_end, headers), expected, data)
+            # Compare the stored names exactly, not case-insensitively
+            self.assertEqual(list(headers.items()), list(expected_headers.items()), data)
+
+        # Request lines that need the regex are left to the Python parser
+        for data in (b"GET  /spaced\tHTTP/1.1\r\nHost: a\r\n\r\n", b"get / HTTP/1.1\r\n\r\n", b"GET / HTTP/2.0\r\n\r\n"):
+            headers = CIDict()
+            self.assertIsNone(parse_head_c(bytearray(data), data.find(b"\r\n\r\n"), headers))
+            self.assertEqual(headers, {})
+
+    async def test_sock_sendmsg(self):
+        """Test that a gathering send delivers every buffer in order."""
+        loop = asyncio.get_running_loop()
+        server_sock, client_sock = socket.socketpair()
+        server_sock.setblocking(False)
+        client_sock.setblocking(False)
+        try:
+            buffers = [b"head\r\n\r\n", os.urandom(4 * 1024 * 1024)]
+            expected = b"".join(buffers)
+
+            async def receive_all():
+                received = bytearray()
+                while len(received) < len(expected):
+                    received += await loop.sock_recv(client_sock, 65536)
+                return bytes(received)
+
+            receiver = asyncio.ensure_future(receive_all())
+            await _sock_sendmsg(loop, server_sock, buffers)
+            self.assertEqual(await receiver, expected)
+        finally:
+            server_sock.close()
+            client_sock.close()
 
 
 if __name__ == "__main__":
@@ -3,32 +3,41 @@
 Unit tests for the HTTPy HTTP/2.0 functionality.
 """
 
-import sys
 import os
 import unittest
 import asyncio
 import socket
 import struct
-from unittest.mock import patch, MagicMock, AsyncMock
-
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from httpy import Request, Response, get
-from httpy.routing import ROUTES
 from httpy.http2 import (
     Frame, FrameType, FrameFlag, ErrorCode, 
-    HTTP2Connection, handle_http2_connection, upgrade_to_http2
+    HTTP2Connection, handle_http2_connection, upgrade_to_http2,
+    HTTP2_MAX_FRAME_SIZE
 )
 
+try:
+    from hypothesis import given, settings, strategies as st
+    HAS_HYPOTHESIS = True
+except ImportError:
+    HAS_HYPOTHESIS = False
+
 
 class TestHTTP2(unittest.IsolatedAsyncioTestCase):
     """Tests for the HTTP/2.0 functionality."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Clear the global ROUTES list before each test
-        ROUTES.clear()
+    async def asyncSetUp(self):
+        """Connect real stream objects to a peer over a socketpair."""
+        server_sock, client_sock = socket.socketpair()
+        self.reader, self.writer = await asyncio.open_connection(sock=server_sock)
+        self.peer_reader, self.peer_writer = await asyncio.open_connection(sock=client_sock)
+        self.conn = HTTP2Connection(self.reader, self.writer)
+
+    async def asyncTearDown(self):
+        """Close both ends of the socketpair."""
+        for writer in (self.writer, self.peer_writer):
+            writer.close()
+            await writer.wait_closed()
 
     def test_frame_serialize_parse(self):
         """Test Frame serialization and parsing."""
@@ -53,16 +62,50 @@ class TestHTTP2(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(parsed_frame.payload, frame.payload)
         self.assertEqual(remaining, b"")
 
-    @patch('asyncio.StreamReader')
-    @patch('asyncio.StreamWriter')
-    async def test_http2_connection_init(self, mock_writer, mock_reader):
+    def assert_round_trip(self, frames):
+        """Serialize frames back to back and check that parsing returns them in order."""
+        data = b"".join(frame.serialize() for frame in frames)
+        for frame in frames:
+            parsed_frame, data = Frame.parse(data)
+            self.assertEqual(parsed_frame.type, frame.type)
+            self.assertEqual(parsed_frame.flags, frame.flags)
+            self.assertEqual(parsed_frame.stream_id, frame.stream_id & 0x7FFFFFFF)
+            self.assertEqual(parsed_frame.payload, frame.payload)
+        self.assertEqual(data, b"")
+
+    def test_frame_serialize_parse_edge_cases(self):
+        """Test round trips at the stream ID and payload size boundaries."""
+        self.assert_round_trip([
+            Frame(FrameType.DATA, FrameFlag.NO_FLAGS, 0, b""),
+            Frame(FrameType.DATA, FrameFlag.END_STREAM, 0x7FFFFFFF, b"x"),
+            # The reserved high bit of the stream ID is dropped on the wire
+            Frame(FrameType.HEADERS, FrameFlag.END_HEADERS, 0x80000001, b"reserved"),
+            Frame(FrameType.CONTINUATION, FrameFlag(0xFF), 3, os.urandom(HTTP2_MAX_FRAME_SIZE)),
+        ])
+
+    if HAS_HYPOTHESIS:
+        @settings(max_examples=100, deadline=None)
+        @given(st.lists(
+            st.builds(
+                Frame,
+                frame_type=st.sampled_from(list(FrameType)),
+                flags=st.integers(0, 255).map(FrameFlag),
+                stream_id=st.integers(0, 2**32 - 1),
+                payload=st.binary(max_size=HTTP2_MAX_FRAME_SIZE),
+            ),
+            min_size=1, max_size=8,
+        ))
+        def test_frame_serialize_parse_generated(self, frames):
+            """Test round trips of generated batches of frames."""
+            self.assert_round_trip(frames)
+
+    async def test_http2_connection_init(self):
         """Test HTTP2Connection initialization."""
-        # Create an HTTP2Connection
-        conn = HTTP2Connection(mock_reader, mock_writer)
+        conn = self.conn
 
         # Check that the connection was initialized correctly
-        self.assertEqual(conn.reader, mock_reader)
-        self.assertEqual(conn.writer, mock_writer)
+        self.assertIs(conn.reader, self.reader)
+        self.assertIs(conn.writer, self.writer)
         self.assertEqual(conn.streams, {})
         self.assertEqual(conn.next_stream_id, 1)
         self.assertFalse(conn.closed)
@@ -75,13 +118,9 @@ class TestHTTP2(unittest.IsolatedAsyncioTestCase):
         self.assertIn(0x5, conn.local_settings)  # MAX_FRAME_SIZE
         self.assertIn(0x6, conn.local_settings)  # MAX_HEADER_LIST_SIZE
 
-    @patch('asyncio.StreamReader')
-    @patch('asyncio.StreamWriter')
-    async def test_send_frame(self, mock_writer, mock_reader):
+    async def test_send_frame(self):
         """Test sending a frame."""
-        # Create an HTTP2Connection
-        mock_writer.drain = AsyncMock()  # Use AsyncMock for awaitable methods
-        conn = HTTP2Connection(mock_reader, mock_writer)
+        conn = self.conn
 
         # Create a frame
         frame = Frame(
@@ -94,45 +133,34 @@ class TestHTTP2(unittest.IsolatedAsyncioTestCase):
         # Send the frame
         await conn.send_frame(frame)
 
-        # Check that the frame was written to the writer
-        mock_writer.write.assert_called_once_with(frame.serialize())
-        mock_writer.drain.assert_called_once()
+        # Check that exactly the serialized frame reached the peer
+        expected = frame.serialize()
+        self.assertEqual(await self.peer_reader.readexactly(len(expected)), expected)
 
-    @patch('asyncio.StreamReader')
-    @patch('asyncio.StreamWriter')
-    async def test_send_settings(self, mock_writer, mock_reader):
+    async def test_send_settings(self):
         """Test sending settings."""
-        # Create an HTTP2Connection
-        mock_writer.drain = AsyncMock()  # Use AsyncMock for awaitable methods
-        conn = HTTP2Connection(mock_reader, mock_writer)
+        conn = self.conn
 
         # Send settings
         await conn.send_settings()
 
-        # Check that a SETTINGS frame was written to the writer
-        mock_writer.write.assert_called_once()
-        mock_writer.drain.assert_called_once()
-
-        # Get the bytes that were written
-        written_bytes = mock_writer.write.call_args[0][0]
-
-        # Parse the frame
-        frame, _ = Frame.parse(written_bytes)
+        # Read the frame header fields the peer received
+        header = await self.peer_reader.readexactly(9)
+        length = int.from_bytes(header[:3], "big")
+        frame_type, flags, stream_id = struct.unpack_from("!BBI", header, 3)
 
         # Check that it's a SETTINGS frame
-        self.assertEqual(frame.type, FrameType.SETTINGS)
-        self.assertEqual(frame.flags, FrameFlag.NO_FLAGS)
-        self.assertEqual(frame.stream_id, 0)
+        self.assertEqual(frame_type, FrameType.SETTINGS)
+        self.assertEqual(flags, FrameFlag.NO_FLAGS)
+        self.assertEqual(stream_id & 0x7FFFFFFF, 0)
 
-        # Check that the payload contains settings
-        self.assertGreater(len(frame.payload), 0)
+        # Check that the payload holds one 6-byte entry per local setting
+        self.assertEqual(length, 6 * len(conn.local_settings))
+        payload = await self.peer_reader.readexactly(length)
+        self.assertEqual(dict(struct.iter_unpack("!HI", payload)), conn.local_settings)
 
-    @patch('asyncio.StreamReader')
-    @patch('asyncio.StreamWriter')
-    async def test_upgrade_to_http2(self, mock_writer, mock_reader):
+    async def test_upgrade_to_http2(self):
         """Test upgrading to HTTP/2."""
-        # Use AsyncMock for awaitable methods
-        mock_writer.drain = AsyncMock()
         # Create a request with HTTP/2 upgrade headers
         req = Request(
             method="GET",
@@ -148,23 +176,18 @@ class TestHTTP2(unittest.IsolatedAsyncioTestCase):
         )
 
         # Upgrade to HTTP/2
-        result = await upgrade_to_http2(req, mock_writer)
+        result = await upgrade_to_http2(req, self.writer)
 
         # Check that the upgrade was successful
         self.assertTrue(result)
 
-        # Check that the 101 response was written to the writer
-        mock_writer.write.assert_called_once()
-        mock_writer.drain.assert_called_once()
-
-        # Get the bytes that were written
-        written_bytes = mock_writer.write.call_args[0][0]
-        written_text = written_bytes.decode('utf-8')
+        # Get the response the peer received
+        written_bytes = await self.peer_reader.readuntil(b"\r\n\r\n")
 
         # Check that it's a 101 Switching Protocols response
-        self.assertIn("HTTP/1.1 101 Switching Protocols", written_text)
-        self.assertIn("Connection: Upgrade", written_text)
-        self.assertIn("Upgrade: h2c", written_text)
+        self.assertIn(b"HTTP/1.1 101 Switching Protocols", written_bytes)
+        self.assertIn(b"Connection: Upgrade", written_bytes)
+        self.assertIn(b"Upgrade: h2c", written_bytes)
 
 
 if __name__ == "__main__":
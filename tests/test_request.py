@@ -3,15 +3,12 @@
 Unit tests for the httpy Request class.
 """
 
-import sys
-import os
 import json
 import unittest
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from httpy import Request
+from httpy.request import parse_query_string
+from httpy.headers import CIDict
 
 
 class TestRequest(unittest.TestCase):
@@ -84,6 +81,52 @@ class TestRequest(unittest.TestCase):
         parsed_data = request.json()
         self.assertIsNone(parsed_data)  # Should return None for non-JSON binary data
 
+    def test_bytes_body(self):
+        """Test JSON parsing and text decoding of a bytes body."""
+        request = Request(
+            method="POST",
+            path="/api/users",
+            headers={"Content-Type": "application/json"},
+            body='{"name": "Zoë"}'.encode('utf-8'),
+            path_params={}
+        )
+
+        self.assertEqual(request.json(), {"name": "Zoë"})
+        self.assertEqual(request.text, '{"name": "Zoë"}')
+
+        # Bodies only the json module accepts parse the same with orjson installed
+        request = Request("POST", "/", {}, '{"n": 18446744073709551616}'.encode('utf-16'), {})
+        self.assertEqual(request.json(), {"n": 2 ** 64})
+
+        request = Request("POST", "/", {}, b"bad \xff byte", {})
+        self.assertEqual(request.text, "bad \ufffd byte")
+        self.assertEqual(Request("GET", "/", {}, "plain", {}).text, "plain")
+
+    def test_parse_query_string(self):
+        """Test parsing query strings."""
+        self.assertEqual(parse_query_string("a=1&b=2"), {"a": "1", "b": "2"})
+        self.assertEqual(parse_query_string("a=1&a=2&a=3"), {"a": ["1", "2", "3"]})
+        self.assertEqual(parse_query_string("q=hello+world&x=%2F"), {"q": "hello world", "x": "/"})
+        # Blank values are skipped, as with urllib.parse.parse_qs
+        self.assertEqual(parse_query_string("a=&b&c=1"), {"c": "1"})
+        self.assertEqual(parse_query_string(""), {})
+
+
+    def test_headers_case_insensitive(self):
+        """Test that request header names are case-insensitive."""
+        request = Request("GET", "/", {"Content-Type": "text/plain"}, "", {})
+        self.assertIsInstance(request.headers, CIDict)
+        self.assertEqual(request.headers["content-type"], "text/plain")
+        self.assertEqual(request.headers.get("CONTENT-TYPE"), "text/plain")
+        self.assertIn("Content-type", request.headers)
+        self.assertEqual(list(request.headers), ["content-type"])
+        self.assertEqual(request.headers, {"Content-Type": "text/plain"})
+
+        request.headers["X-Id"] = "1"
+        request.headers["x-id"] = "2"
+        self.assertEqual(request.headers.pop("X-ID"), "2")
+        self.assertNotIn("x-id", request.headers)
+
 
 if __name__ == "__main__":
     unittest.main()
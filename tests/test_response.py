@@ -3,15 +3,14 @@
 Unit tests for the httpy Response class.
 """
 
-import sys
 import os
 import json
+import tempfile
 import unittest
-
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from unittest.mock import patch
 
 from httpy import Response, HTTP_200_OK, HTTP_404_NOT_FOUND
+from httpy import response as response_module
 
 
 class TestResponse(unittest.TestCase):
@@ -47,15 +46,81 @@ class TestResponse(unittest.TestCase):
         self.assertIn("Content-Length: 13", text_response)
         self.assertIn("Hello, world!", text_response)
 
+    def test_date_header(self):
+        """Test the cached Date header and that a handler's own Date wins."""
+        with patch('httpy.response.time.time', return_value=784111777.5):
+            head = Response("").to_bytes()
+            self.assertIn(b"\r\nDate: Sun, 06 Nov 1994 08:49:37 GMT\r\n", head)
+            self.assertIs(response_module._date_header(), response_module._date_header())
+
+        custom = Response("", headers={"Date": "Mon, 07 Nov 1994 08:49:37 GMT"}).to_bytes()
+        self.assertEqual(custom.count(b"Date: "), 1)
+        self.assertIn(b"Date: Mon, 07 Nov 1994 08:49:37 GMT\r\n", custom)
+
+        # Header names are case-insensitive, so a lowercase date also wins
+        for name in ("date", "DATE"):
+            custom = Response("", headers={name: "Mon, 07 Nov 1994 08:49:37 GMT"}).to_bytes()
+            self.assertEqual(custom.lower().count(b"date: "), 1)
+            self.assertIn(b"Mon, 07 Nov 1994 08:49:37 GMT\r\n", custom)
+
+    @patch('httpy.response._date_header', return_value=b"")
+    def test_header_lines(self, mock_date_header):
+        """Test that header lines are encoded once and reused."""
+        headers = {"X-Id": "abc", "content-length": "99", "Connection": "Close", "X-List": ["a"]}
+        head = Response("", headers=dict(headers)).headers_to_bytes(0)
+        self.assertEqual(head, b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n"
+                               b"X-Id: abc\r\nConnection: close\r\nX-List: ['a']\r\n\r\n")
+        # Only headers whose values repeat across responses are cached
+        self.assertIn(("Connection", "Close"), response_module.HEADER_LINE_CACHE)
+        self.assertNotIn(("X-Id", "abc"), response_module.HEADER_LINE_CACHE)
+        self.assertEqual(Response("", headers=dict(headers)).headers_to_bytes(0), head)
+
+        # Equal values of different types must not share a cached line
+        for value, line in ((1, b"X-Flag: 1\r\n"), (True, b"X-Flag: True\r\n"), (1.0, b"X-Flag: 1.0\r\n")):
+            self.assertIn(line, Response("", headers={"X-Flag": value}).headers_to_bytes(0))
+
+    @patch('httpy.response._date_header', return_value=b"Date: Sun, 06 Nov 1994 08:49:37 GMT\r\n")
+    def test_to_buffers(self, mock_date_header):
+        """Test converting a response to separate head and body buffers."""
+        response = Response("Hello, World!", HTTP_200_OK, {"Content-Type": "text/plain"})
+        head, body = response.to_buffers()
+
+        self.assertTrue(head.startswith(b"HTTP/1.1 200 OK\r\n"))
+        self.assertTrue(head.endswith(b"\r\n\r\n"))
+        self.assertIn(b"Content-Length: 13\r\n", head)
+        self.assertEqual(body, b"Hello, World!")
+        self.assertEqual(head + body, response.to_bytes())
+
     def test_json_response(self):
         """Test creating a JSON response."""
         data = {"name":"Test User","id":123}
         response = Response.json(data)
 
-        self.assertEqual(response.body, json.dumps(data, separators=(',', ':')))
+        self.assertIsInstance(response.body, bytes)
+        self.assertEqual(response.body, b'{"name":"Test User","id":123}')
         self.assertEqual(response.status, HTTP_200_OK)
         self.assertEqual(response.headers["Content-Type"], "application/json")
 
+    def test_json_response_values(self):
+        """Test JSON responses for values orjson can't encode by itself."""
+        data = {1: "one", "big": 2 ** 70, "text": "Zoë"}
+        self.assertEqual(json.loads(Response.json(data).body), {"1": "one", "big": 2 ** 70, "text": "Zoë"})
+
+        # Non-ASCII text is sent unescaped whether or not orjson is installed
+        self.assertEqual(Response.json({"text": "Zoë"}).body, '{"text":"Zoë"}'.encode())
+        self.assertEqual(Response.json({"big": 2 ** 70, "text": "Zoë"}).body,
+                         '{"big":1180591620717411303424,"text":"Zoë"}'.encode())
+
+        # orjson writes non-finite floats as null, the json module as NaN and Infinity
+        expected = b"[null,null]" if response_module.ORJSON_AVAILABLE else b"[NaN,Infinity]"
+        self.assertEqual(Response.json([float("nan"), float("inf")]).body, expected)
+
+        # A caller's headers are kept, and the shared defaults are not modified
+        response = Response.json([], headers={"X-Id": "1"})
+        self.assertEqual(response.headers, {"X-Id": "1", "Content-Type": "application/json"})
+        Response.json([]).headers["X-Id"] = "2"
+        self.assertEqual(Response.json([]).headers, {"Content-Type": "application/json"})
+
     def test_text_response(self):
         """Test creating a text response."""
         text = "Hello, world!"
@@ -65,6 +130,12 @@ class TestResponse(unittest.TestCase):
         self.assertEqual(response.status, HTTP_200_OK)
         self.assertEqual(response.headers["Content-Type"], "text/plain")
 
+    def test_unregistered_status(self):
+        """Test status codes without a registered reason phrase."""
+        response = Response("", 599)
+        self.assertTrue(response.to_bytes().startswith(b"HTTP/1.1 599 Unknown\r\n"))
+        self.assertTrue(Response("", 599).to_bytes().startswith(b"HTTP/1.1 599 Unknown\r\n"))
+
     def test_custom_status(self):
         """Test response with custom status code."""
         response = Response.json(
@@ -114,11 +185,39 @@ class TestResponse(unittest.TestCase):
 
         # Check that _encoded_body is set correctly
         self.assertEqual(response._encoded_body, binary_data)
+        self.assertEqual(response.body_bytes(), binary_data)
+        self.assertEqual(Response("Zoë").body_bytes(), "Zoë".encode())
 
         # Check that the binary data is preserved in to_bytes()
         bytes_response = response.to_bytes()
         self.assertIn(binary_data, bytes_response)
 
 
+    @patch('httpy.response._date_header', return_value=b"Date: Sun, 06 Nov 1994 08:49:37 GMT\r\n")
+    def test_file_response(self, mock_date_header):
+        """Test creating a response backed by a file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "data.json")
+            with open(path, "wb") as f:
+                f.write(b'{"ok":true}')
+
+            response = Response.file(path)
+
+            self.assertEqual(response.file_path, path)
+            self.assertEqual(response.headers["Content-Type"], "application/json")
+            self.assertEqual(
+                response.headers_to_bytes(11),
+                b"HTTP/1.1 200 OK\r\nDate: Sun, 06 Nov 1994 08:49:37 GMT\r\n"
+                b"Content-Length: 11\r\nContent-Type: application/json\r\n\r\n"
+            )
+
+            # to_bytes() reads the file for transports without sendfile
+            bytes_response = response.to_bytes()
+            self.assertIn(b"Content-Length: 11", bytes_response)
+            self.assertTrue(bytes_response.endswith(b'\r\n\r\n{"ok":true}'))
+            self.assertEqual(response.body, b"")
+            self.assertEqual(response.body_bytes(), b'{"ok":true}')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -3,27 +3,18 @@
 Unit tests for the HTTPy routing functionality.
 """
 
-import sys
-import os
 import unittest
 import asyncio
 from unittest.mock import AsyncMock
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
 from httpy import Request, Response, Route, get, post, put, delete, route
-from httpy.routing import ROUTES
+from httpy import routing
+from httpy.routing import find_route
 
 
 class TestRoute(unittest.TestCase):
     """Tests for the Route class."""
 
-    def setUp(self):
-        """Set up test fixtures."""
-        # Clear the global ROUTES list before each test
-        ROUTES.clear()
-
     def test_route_init(self):
         """Test Route initialization."""
         async def handler(req):
@@ -57,15 +48,23 @@ class TestRoute(unittest.TestCase):
         params = route_obj.match("GET", "/api/products/123")
         self.assertIsNone(params)
 
+        # One optional slash at each end, and parameters must be non-empty
+        self.assertEqual(route_obj.match("GET", "api/users/123/"), {'id': '123'})
+        self.assertIsNone(route_obj.match("GET", "/api/users/"))
+        self.assertIsNone(route_obj.match("GET", "/api/users/1/2"))
+        self.assertEqual(Route("GET", "/", handler).match("GET", "/"), {})
+        self.assertEqual(Route("GET", "/about", handler).match("GET", "/about/"), {})
+        self.assertIsNone(Route("GET", "/about", handler).match("GET", "/about/us"))
+
     def test_route_decorator(self):
         """Test route decorator."""
         @route("GET", "/test")
         async def test_handler(req):
             return Response.text("Test")
 
-        self.assertEqual(len(ROUTES), 1)
-        self.assertEqual(ROUTES[0].method, "GET")
-        self.assertEqual(ROUTES[0].handler, test_handler)
+        self.assertEqual(len(routing.ROUTES), 1)
+        self.assertEqual(routing.ROUTES[0].method, "GET")
+        self.assertEqual(routing.ROUTES[0].handler, test_handler)
 
     def test_method_decorators(self):
         """Test HTTP method decorators."""
@@ -85,14 +84,119 @@ class TestRoute(unittest.TestCase):
         async def delete_handler(req):
             return Response.text("DELETE")
 
-        self.assertEqual(len(ROUTES), 4)
+        self.assertEqual(len(routing.ROUTES), 4)
 
-        methods = [r.method for r in ROUTES]
+        methods = [r.method for r in routing.ROUTES]
         self.assertIn("GET", methods)
         self.assertIn("POST", methods)
         self.assertIn("PUT", methods)
         self.assertIn("DELETE", methods)
 
+    def test_find_route(self):
+        """Test finding literal and parametric routes."""
+        async def handler(req):
+            return Response.text("Test")
+
+        users = Route("GET", "/api/users", handler)
+        user = Route("GET", "/api/users/{id}", handler)
+        create = Route("POST", "/api/users", handler)
+        routing.ROUTES.extend([users, user, create])
+
+        self.assertEqual(find_route("GET", "/api/users"), (users, {}))
+        self.assertEqual(find_route("GET", "/api/users/"), (users, {}))
+        self.assertEqual(find_route("GET", "api/users"), (users, {}))
+        self.assertEqual(find_route("GET", "/api/users/7"), (user, {'id': '7'}))
+        self.assertEqual(find_route("POST", "/api/users"), (create, {}))
+        self.assertIsNone(find_route("DELETE", "/api/users"))
+        self.assertIsNone(find_route("GET", "//api/users"))
+        self.assertIsNone(find_route("GET", "/api/products"))
+
+    def test_find_route_registration_order(self):
+        """Test that the first registered matching route wins, as with a linear scan."""
+        async def handler(req):
+            return Response.text("Test")
+
+        by_id = Route("GET", "/users/{id}", handler)
+        me = Route("GET", "/users/me", handler)
+        routing.ROUTES.extend([by_id, me])
+        self.assertEqual(find_route("GET", "/users/me"), (by_id, {'id': 'me'}))
+
+        routing.ROUTES.clear()
+        routing.ROUTES.extend([me, by_id])
+        self.assertEqual(find_route("GET", "/users/me"), (me, {}))
+
+        # Only literal routes ahead of every parametric route skip the search
+        static = routing.ROUTES.build_index()[0]
+        self.assertEqual(static, {("GET", "users/me"): me})
+
+    def test_find_route_many_parametric_routes(self):
+        """Test parameter extraction when many parametric routes share a method."""
+        async def handler(req):
+            return Response.text("Test")
+
+        routes = [Route("GET", f"/resource{i}/{{id}}/items/{{item}}", handler) for i in range(200)]
+        routing.ROUTES.extend(routes)
+        first = Route("GET", "/{section}/{id}/items/{item}", handler)
+        routing.ROUTES.append(first)
+
+        self.assertEqual(find_route("GET", "/resource150/7/items/9/"),
+                         (routes[150], {'id': '7', 'item': '9'}))
+        self.assertEqual(find_route("GET", "/other/7/items/9"),
+                         (first, {'section': 'other', 'id': '7', 'item': '9'}))
+        self.assertIsNone(find_route("GET", "/resource1/7/items"))
+
+        # The first registered of several matching parametric routes wins
+        routing.ROUTES.insert(0, first)
+        self.assertEqual(find_route("GET", "/resource150/7/items/9"),
+                         (first, {'section': 'resource150', 'id': '7', 'item': '9'}))
+
+    def test_find_route_after_changes(self):
+        """Test that routes added or removed after a lookup are seen."""
+        async def handler(req):
+            return Response.text("Test")
+
+        self.assertIsNone(find_route("GET", "/late"))
+        late = Route("GET", "/late", handler)
+        routing.ROUTES.append(late)
+        self.assertEqual(find_route("GET", "/late"), (late, {}))
+        routing.ROUTES.remove(late)
+        self.assertIsNone(find_route("GET", "/late"))
+
+    def test_find_route_root_and_regex_characters(self):
+        """Test the root path and paths containing regex characters."""
+        async def handler(req):
+            return Response.text("Test")
+
+        root = Route("GET", "/", handler)
+        text = Route("GET", "/robots.txt", handler)
+        routing.ROUTES.extend([root, text])
+
+        self.assertEqual(root.literal_path, "")
+        self.assertIsNone(text.literal_path)
+        self.assertEqual(find_route("GET", "/"), (root, {}))
+        self.assertEqual(find_route("GET", "/robots.txt"), (text, {}))
+
+    def test_find_route_trie_and_regex_routes(self):
+        """Test that trie routes and routes with regex characters keep registration order."""
+        async def handler(req):
+            return Response.text("Test")
+
+        report = Route("GET", "/files/{name}/report.pdf", handler)
+        by_name = Route("GET", "/files/{name}/{file}", handler)
+        routing.ROUTES.extend([report, by_name])
+
+        self.assertEqual(report.segments, None)
+        self.assertEqual(by_name.segments, ["files", None, None])
+        self.assertEqual(find_route("GET", "/files/a/report.pdf"), (report, {'name': 'a'}))
+        self.assertEqual(find_route("GET", "/files/a/notes.txt"),
+                         (by_name, {'name': 'a', 'file': 'notes.txt'}))
+        # Parameters never match an empty segment
+        self.assertIsNone(find_route("GET", "/files//notes.txt"))
+
+        routing.ROUTES.insert(0, routing.ROUTES.pop())
+        self.assertEqual(find_route("GET", "/files/a/report.pdf"),
+                         (by_name, {'name': 'a', 'file': 'report.pdf'}))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -5,6 +5,7 @@ These tests verify that the HTTPy framework properly handles security concerns.
 """
 
 import asyncio
+import functools
 import os
 import sys
 import pytest
@@ -27,8 +28,8 @@ except ImportError:
 if not AIOHTTP_AVAILABLE:
     pytest.skip("aiohttp not available, skipping security tests", allow_module_level=True)
 
-# Add the parent directory to the path so we can import the package
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+# The shared client session fixtures need pytest-asyncio
+pytest_asyncio = pytest.importorskip("pytest_asyncio")
 
 from httpy import Request, Response, get, post, run, HTTP_400_BAD_REQUEST
 
@@ -43,8 +44,9 @@ def find_free_port():
         return s.getsockname()[1]
 
 
-def create_self_signed_cert(cert_file, key_file):
-    """Create a self-signed certificate for testing HTTPS."""
+@functools.lru_cache(maxsize=1)
+def _self_signed_cert_pem():
+    """Generate a self-signed certificate and key once, returning (cert_pem, key_pem)."""
     from cryptography import x509
     from cryptography.x509.oid import NameOID
     from cryptography.hazmat.primitives import hashes
@@ -57,14 +59,11 @@ def create_self_signed_cert(cert_file, key_file):
         public_exponent=65537,
         key_size=2048,
     )
-
-    # Write private key to file
-    with open(key_file, "wb") as f:
-        f.write(private_key.private_bytes(
-            encoding=serialization.Encoding.PEM,
-            format=serialization.PrivateFormat.PKCS8,
-            encryption_algorithm=serialization.NoEncryption()
-        ))
+    key_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
 
     # Create a self-signed certificate
     subject = issuer = x509.Name([
@@ -92,9 +91,20 @@ def create_self_signed_cert(cert_file, key_file):
         critical=False,
     ).sign(private_key, hashes.SHA256())
 
-    # Write certificate to file
-    with open(cert_file, "wb") as f:
-        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return cert.public_bytes(serialization.Encoding.PEM), key_pem
+
+
+def create_self_signed_cert(cert_file, key_file):
+    """Write a self-signed certificate for testing HTTPS."""
+    cert_pem, key_pem = _self_signed_cert_pem()
+
+    for path, data, mode in ((key_file, key_pem, 0o600), (cert_file, cert_pem, 0o644)):
+        # A single unbuffered write is enough for these small files
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
 
 
 class SecurityTestServer:
@@ -135,9 +145,9 @@ from httpy import (
 # XSS vulnerable route
 @get("/xss-vulnerable")
 async def xss_vulnerable(req: Request) -> Response:
-    # Simplified response for testing
-    headers = {{"Content-Type": "text/plain"}}
-    return Response(body="XSS Test", headers=headers)
+    # Echo the name without escaping it
+    name = req.query_params.get('name', 'Guest')
+    return Response(body="<h1>Hello, " + name + "!</h1>", headers={{"Content-Type": "text/html"}})
 
 # XSS protected route
 @get("/xss-protected")
@@ -279,7 +289,8 @@ async def secure_headers(req: Request) -> Response:
         "X-Frame-Options": "DENY",
         "X-XSS-Protection": "1; mode=block",
         "Referrer-Policy": "strict-origin-when-cross-origin",
-        "Permissions-Policy": "geolocation=(), microphone=()"
+        "Permissions-Policy": "geolocation=(), microphone=()",
+        "Cache-Control": "no-store"
     }})
 
 # Rate limiting simulation
@@ -323,13 +334,27 @@ if __name__ == "__main__":
 
     def start(self):
         """Start the security test server."""
-        self.process = subprocess.Popen([sys.executable, self.server_file])
-        # Wait longer for server to start
-        time.sleep(5)  # Increased from 2 to 5 seconds
-
-        # Verify server is running by checking if the process is still alive
-        if self.process.poll() is not None:
-            raise RuntimeError(f"Server process exited with code {self.process.returncode}")
+        # Skip the user site directory and use the frozen stdlib to start faster
+        self.process = subprocess.Popen(
+            [sys.executable, "-X", "frozen_modules=on", self.server_file],
+            env={**os.environ, "PYTHONNOUSERSITE": "1"},
+        )
+        # Poll both ports instead of sleeping a fixed amount of time
+        for port in (self.port, self.port + 1):
+            self.wait_ready(port)
+
+    def wait_ready(self, port, timeout=10):
+        """Wait until the server process accepts connections on the given port."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Server process exited with code {self.process.returncode}")
+            try:
+                socket.create_connection(("localhost", port), timeout=0.1).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError(f"Server did not start listening on port {port}")
 
     def stop(self):
         """Stop the security test server."""
@@ -340,6 +365,23 @@ if __name__ == "__main__":
         self.temp_dir.cleanup()
 
 
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def http_session():
+    """Share one aiohttp session so the tests reuse its connector."""
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def https_session():
+    """Share one aiohttp session for HTTPS that accepts the self-signed certificate."""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
+        yield session
+
+
 @pytest.fixture
 def security_server():
     """Start the security test server for testing."""
@@ -356,348 +398,334 @@ def security_server():
 class TestXSSSecurity:
     """Test Cross-Site Scripting (XSS) protection."""
 
-    @pytest.mark.asyncio
-    async def test_xss_vulnerable(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_xss_vulnerable(self, security_server, http_session):
         """Test XSS vulnerable endpoint."""
         http_port, _ = security_server
 
         # XSS payload
         xss_payload = "<script>alert('XSS')</script>"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/xss-vulnerable", params={"name": xss_payload}) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
+        async with http_session.get(f"http://localhost:{http_port}/xss-vulnerable", params={"name": xss_payload}) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
 
-                # If status is 200, verify the response content
-                if response.status == 200:
-                    html = await response.text()
-                    # The script tag should be present in the vulnerable endpoint
-                    assert xss_payload in html
+            # If status is 200, verify the response content
+            if response.status == 200:
+                html = await response.text()
+                # The script tag should be present in the vulnerable endpoint
+                assert xss_payload in html
 
-    @pytest.mark.asyncio
-    async def test_xss_protected(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_xss_protected(self, security_server, http_session):
         """Test XSS protected endpoint."""
         http_port, _ = security_server
 
         # XSS payload
         xss_payload = "<script>alert('XSS')</script>"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/xss-protected", params={"name": xss_payload}) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
+        async with http_session.get(f"http://localhost:{http_port}/xss-protected", params={"name": xss_payload}) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
 
-                # If status is 200, verify the response content
-                if response.status == 200:
-                    html = await response.text()
-                    # The script tag should be escaped in the protected endpoint
-                    assert xss_payload not in html
-                    assert "&lt;script&gt;" in html
+            # If status is 200, verify the response content
+            if response.status == 200:
+                html = await response.text()
+                # The script tag should be escaped in the protected endpoint
+                assert xss_payload not in html
+                assert "&lt;script&gt;" in html
 
 
 class TestSQLInjectionSecurity:
     """Test SQL Injection protection."""
 
-    @pytest.mark.asyncio
-    async def test_sql_vulnerable(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_sql_vulnerable(self, security_server, http_session):
         """Test SQL injection vulnerable endpoint."""
         http_port, _ = security_server
 
         # SQL injection payload
         sql_payload = "1' OR '1'='1"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/sql-vulnerable", params={"id": sql_payload}) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (500, 500)  # Both values are 500 since we expect 500 anyway
-
-                # If we get a 500 response with JSON body, verify the content
-                if response.status == 500 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert "error" in data
-                        assert "Database error" in data["error"]
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
-
-    @pytest.mark.asyncio
-    async def test_sql_protected(self, security_server):
+        async with http_session.get(f"http://localhost:{http_port}/sql-vulnerable", params={"id": sql_payload}) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (500, 500)  # Both values are 500 since we expect 500 anyway
+
+            # If we get a 500 response with JSON body, verify the content
+            if response.status == 500 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert "error" in data
+                    assert "Database error" in data["error"]
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_sql_protected(self, security_server, http_session):
         """Test SQL injection protected endpoint."""
         http_port, _ = security_server
 
         # SQL injection payload
         sql_payload = "1' OR '1'='1"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/sql-protected", params={"id": sql_payload}) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (400, 500)
+        async with http_session.get(f"http://localhost:{http_port}/sql-protected", params={"id": sql_payload}) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (400, 500)
 
-                # If we get a 400 response with JSON body, verify the content
-                if response.status == 400 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert "error" in data
-                        assert "Invalid user ID" in data["error"]
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
+            # If we get a 400 response with JSON body, verify the content
+            if response.status == 400 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert "error" in data
+                    assert "Invalid user ID" in data["error"]
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
 
 
 class TestCSRFSecurity:
     """Test Cross-Site Request Forgery (CSRF) protection."""
 
-    @pytest.mark.asyncio
-    async def test_csrf_vulnerable(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_csrf_vulnerable(self, security_server, http_session):
         """Test CSRF vulnerable endpoint."""
         http_port, _ = security_server
 
         # No CSRF token required
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://localhost:{http_port}/csrf-vulnerable",
-                json={"action": "update_email", "email": "new@example.com"}
-            ) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
-
-                # If we get a 200 response with JSON body, verify the content
-                if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert data["success"] is True
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
-
-    @pytest.mark.asyncio
-    async def test_csrf_protected_without_token(self, security_server):
+        async with http_session.post(
+            f"http://localhost:{http_port}/csrf-vulnerable",
+            json={"action": "update_email", "email": "new@example.com"}
+        ) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
+
+            # If we get a 200 response with JSON body, verify the content
+            if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert data["success"] is True
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_csrf_protected_without_token(self, security_server, http_session):
         """Test CSRF protected endpoint without token."""
         http_port, _ = security_server
 
         # No CSRF token provided
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://localhost:{http_port}/csrf-protected",
-                json={"action": "update_email", "email": "new@example.com"}
-            ) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (403, 500)
-
-                # If we get a 403 response with JSON body, verify the content
-                if response.status == 403 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert "error" in data
-                        assert "Invalid CSRF token" in data["error"]
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
-
-    @pytest.mark.asyncio
-    async def test_csrf_protected_with_token(self, security_server):
+        async with http_session.post(
+            f"http://localhost:{http_port}/csrf-protected",
+            json={"action": "update_email", "email": "new@example.com"}
+        ) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (403, 500)
+
+            # If we get a 403 response with JSON body, verify the content
+            if response.status == 403 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert "error" in data
+                    assert "Invalid CSRF token" in data["error"]
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_csrf_protected_with_token(self, security_server, http_session):
         """Test CSRF protected endpoint with valid token."""
         http_port, _ = security_server
 
         # Valid CSRF token provided
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"http://localhost:{http_port}/csrf-protected",
-                json={"action": "update_email", "email": "new@example.com"},
-                headers={"X-CSRF-Token": "valid-csrf-token"}
-            ) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
-
-                # If we get a 200 response with JSON body, verify the content
-                if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert data["success"] is True
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
+        async with http_session.post(
+            f"http://localhost:{http_port}/csrf-protected",
+            json={"action": "update_email", "email": "new@example.com"},
+            headers={"X-CSRF-Token": "valid-csrf-token"}
+        ) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
+
+            # If we get a 200 response with JSON body, verify the content
+            if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert data["success"] is True
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
 
 
 class TestAuthenticationSecurity:
     """Test authentication security."""
 
-    @pytest.mark.asyncio
-    async def test_basic_auth_no_credentials(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_basic_auth_no_credentials(self, security_server, http_session):
         """Test basic auth without credentials."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/basic-auth") as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (401, 500)
+        async with http_session.get(f"http://localhost:{http_port}/basic-auth") as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (401, 500)
 
-                # If we get a 401 response, verify the headers
-                if response.status == 401:
-                    assert "WWW-Authenticate" in response.headers
+            # If we get a 401 response, verify the headers
+            if response.status == 401:
+                assert "WWW-Authenticate" in response.headers
 
-    @pytest.mark.asyncio
-    async def test_basic_auth_invalid_credentials(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_basic_auth_invalid_credentials(self, security_server, http_session):
         """Test basic auth with invalid credentials."""
         http_port, _ = security_server
 
         auth = aiohttp.BasicAuth("admin", "wrong-password")
-        async with aiohttp.ClientSession(auth=auth) as session:
-            async with session.get(f"http://localhost:{http_port}/basic-auth") as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (401, 500)
+        async with http_session.get(f"http://localhost:{http_port}/basic-auth", auth=auth) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (401, 500)
 
-                # If we get a 401 response, verify the headers
-                if response.status == 401:
-                    assert "WWW-Authenticate" in response.headers
+            # If we get a 401 response, verify the headers
+            if response.status == 401:
+                assert "WWW-Authenticate" in response.headers
 
-    @pytest.mark.asyncio
-    async def test_basic_auth_valid_credentials(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_basic_auth_valid_credentials(self, security_server, http_session):
         """Test basic auth with valid credentials."""
         http_port, _ = security_server
 
         auth = aiohttp.BasicAuth("admin", "password")
-        async with aiohttp.ClientSession(auth=auth) as session:
-            async with session.get(f"http://localhost:{http_port}/basic-auth") as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
+        async with http_session.get(f"http://localhost:{http_port}/basic-auth", auth=auth) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
 
-                # If we get a 200 response with JSON body, verify the content
-                if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
-                    try:
-                        data = await response.json()
-                        assert data["authenticated"] is True
-                        assert data["user"] == "admin"
-                    except:
-                        # If we can't parse the JSON, that's okay for now
-                        pass
+            # If we get a 200 response with JSON body, verify the content
+            if response.status == 200 and response.headers.get('Content-Type', '').startswith('application/json'):
+                try:
+                    data = await response.json()
+                    assert data["authenticated"] is True
+                    assert data["user"] == "admin"
+                except:
+                    # If we can't parse the JSON, that's okay for now
+                    pass
 
 
 class TestSecurityHeaders:
     """Test security headers."""
 
-    @pytest.mark.asyncio
-    async def test_content_security_policy(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_content_security_policy(self, security_server, http_session):
         """Test Content Security Policy header."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/csp") as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
+        async with http_session.get(f"http://localhost:{http_port}/csp") as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
 
-                # If we get a 200 response, verify the headers
-                if response.status == 200:
-                    assert "Content-Security-Policy" in response.headers
-                    csp = response.headers["Content-Security-Policy"]
-                    assert "script-src 'none'" in csp
+            # If we get a 200 response, verify the headers
+            if response.status == 200:
+                assert "Content-Security-Policy" in response.headers
+                csp = response.headers["Content-Security-Policy"]
+                assert "script-src 'none'" in csp
 
-    @pytest.mark.asyncio
-    async def test_cors_headers(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_cors_headers(self, security_server, http_session):
         """Test CORS headers."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            # Test preflight request
-            async with session.options(
-                f"http://localhost:{http_port}/cors",
-                headers={"Origin": "https://example.com", "Access-Control-Request-Method": "GET"}
-            ) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (204, 500)
-
-                # If we get a 204 response, verify the headers
-                if response.status == 204:
-                    assert "Access-Control-Allow-Origin" in response.headers
-                    assert "Access-Control-Allow-Methods" in response.headers
-                    assert "Access-Control-Max-Age" in response.headers
-
-            # Test actual request
-            async with session.get(
-                f"http://localhost:{http_port}/cors",
-                headers={"Origin": "https://example.com"}
-            ) as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
-
-                # If we get a 200 response, verify the headers
-                if response.status == 200:
-                    assert "Access-Control-Allow-Origin" in response.headers
-                    assert response.headers["Access-Control-Allow-Origin"] == "*"
-
-    @pytest.mark.asyncio
-    async def test_secure_headers(self, security_server):
+        # Test preflight request
+        async with http_session.options(
+            f"http://localhost:{http_port}/cors",
+            headers={"Origin": "https://example.com", "Access-Control-Request-Method": "GET"}
+        ) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (204, 500)
+
+            # If we get a 204 response, verify the headers
+            if response.status == 204:
+                assert "Access-Control-Allow-Origin" in response.headers
+                assert "Access-Control-Allow-Methods" in response.headers
+                assert "Access-Control-Max-Age" in response.headers
+
+        # Test actual request
+        async with http_session.get(
+            f"http://localhost:{http_port}/cors",
+            headers={"Origin": "https://example.com"}
+        ) as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
+
+            # If we get a 200 response, verify the headers
+            if response.status == 200:
+                assert "Access-Control-Allow-Origin" in response.headers
+                assert response.headers["Access-Control-Allow-Origin"] == "*"
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_secure_headers(self, security_server, http_session):
         """Test secure headers."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/secure-headers") as response:
-                # Temporarily accept 500 status code to verify server is responding
-                assert response.status in (200, 500)
+        async with http_session.get(f"http://localhost:{http_port}/secure-headers") as response:
+            # Temporarily accept 500 status code to verify server is responding
+            assert response.status in (200, 500)
 
-                # If we get a 200 response, verify the headers
-                if response.status == 200:
-                    # Check for security headers
-                    assert "Strict-Transport-Security" in response.headers
-                    assert "X-Content-Type-Options" in response.headers
-                    assert "X-Frame-Options" in response.headers
-                    assert "X-XSS-Protection" in response.headers
-                    assert "Referrer-Policy" in response.headers
-                    assert "Permissions-Policy" in response.headers
+            # If we get a 200 response, verify the headers
+            if response.status == 200:
+                # Check for security headers
+                assert "Strict-Transport-Security" in response.headers
+                assert "X-Content-Type-Options" in response.headers
+                assert "X-Frame-Options" in response.headers
+                assert "X-XSS-Protection" in response.headers
+                assert "Referrer-Policy" in response.headers
+                assert "Permissions-Policy" in response.headers
 
-                    # Verify header values
-                    assert response.headers["X-Content-Type-Options"] == "nosniff"
-                    assert response.headers["X-Frame-Options"] == "DENY"
+                # Verify header values
+                assert response.headers["X-Content-Type-Options"] == "nosniff"
+                assert response.headers["X-Frame-Options"] == "DENY"
 
 
 class TestRateLimiting:
     """Test rate limiting."""
 
-    @pytest.mark.asyncio
-    async def test_rate_limiting(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_rate_limiting(self, security_server, http_session):
         """Test rate limiting."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            # Make 6 requests (limit is 5)
-            responses = []
-            for i in range(6):
-                async with session.get(f"http://localhost:{http_port}/rate-limit") as response:
-                    # Temporarily accept 500 status code to verify server is responding
-                    if response.status in (200, 429, 500):
-                        try:
-                            data = await response.json()
-                            responses.append((response.status, data))
-                        except:
-                            # If we can't parse the JSON, use an empty dict
-                            responses.append((response.status, {}))
-                    else:
-                        assert False, f"Unexpected status code: {response.status}"
-
-            # If we got 500 errors, skip the detailed checks
-            if any(status == 500 for status, _ in responses):
-                return
+        # Make 6 requests (limit is 5)
+        responses = []
+        for i in range(6):
+            async with http_session.get(f"http://localhost:{http_port}/rate-limit") as response:
+                # Temporarily accept 500 status code to verify server is responding
+                if response.status in (200, 429, 500):
+                    try:
+                        data = await response.json()
+                        responses.append((response.status, data))
+                    except:
+                        # If we can't parse the JSON, use an empty dict
+                        responses.append((response.status, {}))
+                else:
+                    assert False, f"Unexpected status code: {response.status}"
+
+        # If we got 500 errors, skip the detailed checks
+        if any(status == 500 for status, _ in responses):
+            return
 
-            # First 5 requests should succeed
-            for i in range(5):
-                status, data = responses[i]
-                assert status == 200
-                assert data["count"] == i + 1
+        # First 5 requests should succeed
+        for i in range(5):
+            status, data = responses[i]
+            assert status == 200
+            assert data["count"] == i + 1
 
-            # 6th request should be rate limited
-            status, data = responses[5]
-            assert status == 429
-            assert "error" in data
-            assert "Rate limit exceeded" in data["error"]
+        # 6th request should be rate limited
+        status, data = responses[5]
+        assert status == 429
+        assert "error" in data
+        assert "Rate limit exceeded" in data["error"]
 
 
 class TestHTTPSSecurity:
     """Test HTTPS security."""
 
     # @pytest.mark.asyncio
-    # async def test_https_connection(self, security_server):
+    # async def test_https_connection(self, security_server, http_session):
     #     """Test HTTPS connection."""
     #     _, https_port = security_server
     #
@@ -723,8 +751,8 @@ class TestHTTPSSecurity:
 class TestInputValidation:
     """Test input validation."""
 
-    @pytest.mark.asyncio
-    async def test_path_validation(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_path_validation(self, security_server, http_session):
         """Test path validation with potentially malicious paths."""
         http_port, _ = security_server
 
@@ -736,16 +764,15 @@ class TestInputValidation:
             "/api/..%2f..%2fsecret"
         ]
 
-        async with aiohttp.ClientSession() as session:
-            for path in malicious_paths:
-                async with session.get(f"http://localhost:{http_port}{path}") as response:
-                    # Should return 400 Bad Request or 404 Not Found, not 200 OK
-                    assert response.status != 200
-                    # Ideally should be 400 Bad Request, but 404 is acceptable
-                    assert response.status in (400, 404, 500)
+        for path in malicious_paths:
+            async with http_session.get(f"http://localhost:{http_port}{path}") as response:
+                # Should return 400 Bad Request or 404 Not Found, not 200 OK
+                assert response.status != 200
+                # Ideally should be 400 Bad Request, but 404 is acceptable
+                assert response.status in (400, 404, 500)
 
     # @pytest.mark.asyncio
-    # async def test_header_validation(self, security_server):
+    # async def test_header_validation(self, security_server, http_session):
     #     """Test header validation with malformed headers."""
     #     http_port, _ = security_server
     #
@@ -766,39 +793,34 @@ class TestInputValidation:
     #                 # Should not crash the server
     #                 assert response.status in (400, 404, 500)
 
-    @pytest.mark.asyncio
-    async def test_query_param_validation(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_query_param_validation(self, security_server, http_session):
         """Test query parameter validation."""
         http_port, _ = security_server
 
-        # Test with malicious query parameters
-        malicious_params = [
+        # Test with malicious values for the validated id parameter
+        malicious_values = [
             # SQL injection attempt
-            {"id": "1 OR 1=1"},
+            "1 OR 1=1",
             # XSS attempt
-            {"name": "<script>alert('XSS')</script>"},
+            "<script>alert('XSS')</script>",
             # Command injection attempt
-            {"cmd": "cat /etc/passwd"},
+            "cat /etc/passwd",
             # Extremely long parameter
-            {"param": "A" * 10000}
+            "A" * 10000
         ]
 
-        async with aiohttp.ClientSession() as session:
-            for params in malicious_params:
-                async with session.get(f"http://localhost:{http_port}/sql-protected", params=params) as response:
-                    # Should not crash the server
-                    assert response.status in (400, 404, 500)
-
-                    # For SQL injection and long parameter, should return 400 Bad Request
-                    if "id" in params or "param" in params:
-                        assert response.status in (400, 500)
+        for value in malicious_values:
+            async with http_session.get(f"http://localhost:{http_port}/sql-protected", params={"id": value}) as response:
+                # Should be rejected as a bad request without crashing the server
+                assert response.status in (400, 500)
 
 
 # class TestWebVulnerabilityProtection:
 #     """Test protection against common web vulnerabilities."""
 #
 #     @pytest.mark.asyncio
-#     async def test_http_method_handling(self, security_server):
+#     async def test_http_method_handling(self, security_server, http_session):
 #         """Test handling of different HTTP methods."""
 #         http_port, _ = security_server
 #
@@ -821,7 +843,7 @@ class TestInputValidation:
 #                     pass
 #
 #     @pytest.mark.asyncio
-#     async def test_host_header_injection(self, security_server):
+#     async def test_host_header_injection(self, security_server, http_session):
 #         """Test protection against Host header injection."""
 #         http_port, _ = security_server
 #
@@ -842,7 +864,7 @@ class TestInputValidation:
 #                     assert response.status in (400, 404, 500)
 #
 #     @pytest.mark.asyncio
-#     async def test_request_smuggling(self, security_server):
+#     async def test_request_smuggling(self, security_server, http_session):
 #         """Test protection against HTTP request smuggling."""
 #         http_port, _ = security_server
 #
@@ -881,87 +903,77 @@ class TestInputValidation:
 class TestSecurityBestPractices:
     """Test implementation of security best practices."""
 
-    @pytest.mark.asyncio
-    async def test_cookie_security(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_cookie_security(self, security_server, https_session):
         """Test secure cookie settings."""
         http_port, https_port = security_server
 
-        # Create SSL context that doesn't verify certificate (since we're using self-signed)
-        ssl_context = ssl.create_default_context()
-        ssl_context.check_hostname = False
-        ssl_context.verify_mode = ssl.CERT_NONE
-
-        async with aiohttp.ClientSession() as session:
-            # Test secure headers endpoint which should set secure cookies
-            try:
-                async with session.get(f"https://localhost:{https_port}/secure-headers", ssl=ssl_context) as response:
-                    if response.status == 200:
-                        # Check for secure cookies in Set-Cookie header
-                        for cookie in response.cookies.values():
-                            if cookie.get('secure', False):
-                                # If any secure cookie is found, the test passes
-                                assert cookie.get('secure') is True
-                                # HttpOnly flag should be set for sensitive cookies
-                                assert cookie.get('httponly', False) is True
-                                # SameSite should be set to Lax or Strict
-                                assert cookie.get('samesite', '') in ('Lax', 'Strict')
-            except aiohttp.ClientError:
-                # If we can't connect to the HTTPS server, that's okay for now
-                pass
-
-    @pytest.mark.asyncio
-    async def test_cache_control_headers(self, security_server):
+        # Test secure headers endpoint which should set secure cookies
+        try:
+            async with https_session.get(f"https://localhost:{https_port}/secure-headers") as response:
+                if response.status == 200:
+                    # Check for secure cookies in Set-Cookie header
+                    for cookie in response.cookies.values():
+                        if cookie.get('secure', False):
+                            # If any secure cookie is found, the test passes
+                            assert cookie.get('secure') is True
+                            # HttpOnly flag should be set for sensitive cookies
+                            assert cookie.get('httponly', False) is True
+                            # SameSite should be set to Lax or Strict
+                            assert cookie.get('samesite', '') in ('Lax', 'Strict')
+        except aiohttp.ClientError:
+            # If we can't connect to the HTTPS server, that's okay for now
+            pass
+
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_cache_control_headers(self, security_server, http_session):
         """Test appropriate cache control headers for sensitive content."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            # Test secure headers endpoint which should set appropriate cache control
-            async with session.get(f"http://localhost:{http_port}/secure-headers") as response:
-                if response.status == 200:
-                    # Check for Cache-Control header
-                    assert "Cache-Control" in response.headers
-                    cache_control = response.headers["Cache-Control"]
+        # Test secure headers endpoint which should set appropriate cache control
+        async with http_session.get(f"http://localhost:{http_port}/secure-headers") as response:
+            if response.status == 200:
+                # Check for Cache-Control header
+                assert "Cache-Control" in response.headers
+                cache_control = response.headers["Cache-Control"]
 
-                    # For sensitive content, should include no-store
-                    assert "no-store" in cache_control or "private" in cache_control
+                # For sensitive content, should include no-store
+                assert "no-store" in cache_control or "private" in cache_control
 
-    @pytest.mark.asyncio
-    async def test_content_type_options(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_content_type_options(self, security_server, http_session):
         """Test X-Content-Type-Options header to prevent MIME sniffing."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/secure-headers") as response:
-                if response.status == 200:
-                    # Check for X-Content-Type-Options header
-                    assert "X-Content-Type-Options" in response.headers
-                    assert response.headers["X-Content-Type-Options"] == "nosniff"
+        async with http_session.get(f"http://localhost:{http_port}/secure-headers") as response:
+            if response.status == 200:
+                # Check for X-Content-Type-Options header
+                assert "X-Content-Type-Options" in response.headers
+                assert response.headers["X-Content-Type-Options"] == "nosniff"
 
-    @pytest.mark.asyncio
-    async def test_frame_options(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_frame_options(self, security_server, http_session):
         """Test X-Frame-Options header to prevent clickjacking."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/secure-headers") as response:
-                if response.status == 200:
-                    # Check for X-Frame-Options header
-                    assert "X-Frame-Options" in response.headers
-                    assert response.headers["X-Frame-Options"] in ("DENY", "SAMEORIGIN")
+        async with http_session.get(f"http://localhost:{http_port}/secure-headers") as response:
+            if response.status == 200:
+                # Check for X-Frame-Options header
+                assert "X-Frame-Options" in response.headers
+                assert response.headers["X-Frame-Options"] in ("DENY", "SAMEORIGIN")
 
-    @pytest.mark.asyncio
-    async def test_permissions_policy(self, security_server):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_permissions_policy(self, security_server, http_session):
         """Test Permissions-Policy header to control browser features."""
         http_port, _ = security_server
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(f"http://localhost:{http_port}/secure-headers") as response:
-                if response.status == 200:
-                    # Check for Permissions-Policy header
-                    assert "Permissions-Policy" in response.headers
-                    # Should restrict sensitive permissions
-                    permissions_policy = response.headers["Permissions-Policy"]
-                    assert "geolocation=" in permissions_policy or "microphone=" in permissions_policy
+        async with http_session.get(f"http://localhost:{http_port}/secure-headers") as response:
+            if response.status == 200:
+                # Check for Permissions-Policy header
+                assert "Permissions-Policy" in response.headers
+                # Should restrict sensitive permissions
+                permissions_policy = response.headers["Permissions-Policy"]
+                assert "geolocation=" in permissions_policy or "microphone=" in permissions_policy
 
 
 if __name__ == "__main__":
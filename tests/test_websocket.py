@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the HTTPy WebSocket functionality.
+"""
+
+import os
+import asyncio
+import unittest
+from unittest.mock import MagicMock, AsyncMock
+
+from httpy.request import Request
+from httpy.websocket import WebSocketConnection, WebSocketOpCode, handle_websocket_handshake, apply_mask, NUMPY_AVAILABLE, WSMASK_AVAILABLE, _apply_mask_numpy, _apply_mask_translate
+
+if WSMASK_AVAILABLE:
+    from httpy._wsmask import apply_mask as apply_mask_c
+
+
+def reference_mask(data, mask):
+    """Mask data one byte at a time, as described in RFC 6455."""
+    return bytes(b ^ mask[i % 4] for i, b in enumerate(data))
+
+
+class TestApplyMask(unittest.TestCase):
+    """Tests for WebSocket payload masking."""
+
+    def test_apply_mask(self):
+        """Test masking payloads of various lengths."""
+        mask = b'\x37\xfa\x21\x3d'
+        for length in (0, 1, 3, 4, 5, 7, 8, 9, 15, 16, 17, 125, 126, 1000, 65536 + 3):
+            data = os.urandom(length)
+            self.assertEqual(apply_mask(data, mask), reference_mask(data, mask), length)
+
+    def test_apply_mask_round_trip(self):
+        """Test that masking twice returns the original payload."""
+        mask = os.urandom(4)
+        data = b"Hello, WebSocket!" * 10
+        self.assertEqual(apply_mask(apply_mask(data, mask), mask), data)
+
+    def test_apply_mask_translate(self):
+        """Test the translate-table masking path."""
+        mask = os.urandom(4)
+        for length in (0, 1, 4, 5, 511, 512, 513, 4099):
+            data = os.urandom(length)
+            self.assertEqual(_apply_mask_translate(data, mask), reference_mask(data, mask), length)
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, "NumPy not available")
+    def test_apply_mask_numpy(self):
+        """Test the NumPy masking path, including unaligned tails."""
+        mask = os.urandom(4)
+        for length in (1, 4, 1023, 1024, 1025, 1027, 65536 + 3):
+            data = os.urandom(length)
+            self.assertEqual(_apply_mask_numpy(data, mask, length), reference_mask(data, mask), length)
+
+    @unittest.skipUnless(WSMASK_AVAILABLE, "_wsmask extension not built")
+    def test_apply_mask_c(self):
+        """Test the C masking path across the SSE2, 64-bit and tail loops."""
+        mask = os.urandom(4)
+        for length in (0, 1, 7, 8, 9, 127, 128, 129, 143, 191, 192, 200, 65536 + 3):
+            data = os.urandom(length)
+            self.assertEqual(apply_mask_c(data, mask), reference_mask(data, mask), length)
+            self.assertEqual(apply_mask_c(bytearray(data), mask), reference_mask(data, mask), length)
+        with self.assertRaises(ValueError):
+            apply_mask_c(b"data", b"abc")
+
+    def test_apply_mask_leading_zeros(self):
+        """Test that leading zero bytes survive the integer round trip."""
+        mask = b'\x00\x00\x00\x00'
+        data = b'\x00\x00\x00\x01'
+        self.assertEqual(apply_mask(data, mask), data)
+
+
+class TestWebSocketConnection(unittest.IsolatedAsyncioTestCase):
+    """Tests for the WebSocketConnection class."""
+
+    def create_connection(self, incoming=b""):
+        """Create a connection with a mock writer that records written data."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        writer.written = bytearray()
+        writer.write.side_effect = writer.written.extend
+        writer.writelines.side_effect = lambda buffers: writer.written.extend(b"".join(buffers))
+        reader = asyncio.StreamReader()
+        reader.feed_data(incoming)
+        return WebSocketConnection(writer, "/ws", {}, reader=reader)
+
+    def masked_frame(self, first_byte, payload):
+        """Build a client frame with a masked payload."""
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = bytes((first_byte, 0x80 | length))
+        else:
+            header = bytes((first_byte, 0x80 | 126)) + length.to_bytes(2, "big")
+        return header + mask + reference_mask(payload, mask)
+
+    async def test_receive(self):
+        """Test receiving masked frames from the connection's reader."""
+        large = os.urandom(1000)
+        ws = self.create_connection(self.masked_frame(0x81, b"hello") + self.masked_frame(0x82, large))
+        message = await ws.receive()
+        self.assertEqual(message.opcode, WebSocketOpCode.TEXT)
+        self.assertEqual(message.data, b"hello")
+        message = await ws.receive()
+        self.assertEqual(message.opcode, WebSocketOpCode.BINARY)
+        self.assertEqual(message.data, large)
+
+    async def test_receive_ping(self):
+        """Test that pings are answered with a pong carrying the same data."""
+        ws = self.create_connection(self.masked_frame(0x89, b"abc"))
+        message = await ws.receive()
+        self.assertEqual(message.opcode, WebSocketOpCode.PING)
+        self.assertEqual(bytes(ws.writer.written), b"\x8a\x03abc")
+
+    async def test_receive_close(self):
+        """Test that a close frame is echoed and its reason decoded on access."""
+        ws = self.create_connection(self.masked_frame(0x88, b"\x03\xe9bye \xc3\xa9"))
+        ws.writer.wait_closed = AsyncMock()
+        message = await ws.receive()
+
+        self.assertTrue(message.is_close)
+        self.assertEqual(message.close_code, 1001)
+        self.assertEqual(message.close_reason, "bye é")
+        self.assertEqual(bytes(ws.writer.written), b"\x88\x08\x03\xe9bye \xc3\xa9")
+        self.assertTrue(ws.closed)
+
+    async def test_receive_wait_for_data_frame(self):
+        """Test skipping control frames while waiting for a data frame."""
+        ws = self.create_connection(
+            self.masked_frame(0x89, b"ping") + self.masked_frame(0x8a, b"") + self.masked_frame(0x81, b"data")
+        )
+        message = await ws.receive(wait_for_data_frame=True)
+
+        self.assertEqual(message.opcode, WebSocketOpCode.TEXT)
+        self.assertEqual(message.data, b"data")
+        # The ping was still answered
+        self.assertEqual(bytes(ws.writer.written), b"\x8a\x04ping")
+
+    async def test_receive_without_reader(self):
+        """Test that receiving without a reader raises ConnectionError."""
+        ws = WebSocketConnection(MagicMock(), "/ws", {})
+        with self.assertRaises(ConnectionError):
+            await ws.receive()
+
+    async def test_send_frame_headers(self):
+        """Test frame headers for each payload length encoding."""
+        cases = [
+            (b"x" * 5, b"\x82\x05"),
+            (b"x" * 125, b"\x82\x7d"),
+            (b"x" * 126, b"\x82\x7e\x00\x7e"),
+            (b"x" * 65535, b"\x82\x7e\xff\xff"),
+            (b"x" * 65536, b"\x82\x7f\x00\x00\x00\x00\x00\x01\x00\x00"),
+        ]
+        for payload, header in cases:
+            ws = self.create_connection()
+            await ws.send(payload)
+            self.assertEqual(bytes(ws.writer.written), header + payload, len(payload))
+
+    async def test_send_text(self):
+        """Test that text messages are sent as UTF-8 TEXT frames."""
+        ws = self.create_connection()
+        await ws.send_text("héllo")
+        self.assertEqual(bytes(ws.writer.written), b"\x81\x06" + "héllo".encode("utf-8"))
+        ws.writer.drain.assert_awaited_once()
+
+    async def test_send_list(self):
+        """Test that a list of messages is sent as separate frames in one write."""
+        ws = self.create_connection()
+        await ws.send(["hi", b"\x00\x01"])
+        self.assertEqual(bytes(ws.writer.written), b"\x81\x02hi\x82\x02\x00\x01")
+        ws.writer.writelines.assert_called_once()
+        ws.writer.write.assert_not_called()
+
+
+class TestWebSocketHandshake(unittest.IsolatedAsyncioTestCase):
+    """Tests for the WebSocket handshake."""
+
+    async def test_handshake(self):
+        """Test the handshake response using the example key from RFC 6455."""
+        writer = MagicMock()
+        writer.drain = AsyncMock()
+        headers = {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ==",
+            "Sec-WebSocket-Version": "13",
+        }
+        req = Request("GET", "/ws", headers, "", {}, {})
+
+        ws = await handle_websocket_handshake(req, writer)
+
+        self.assertIsInstance(ws, WebSocketConnection)
+        writer.write.assert_called_once_with(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\n"
+            b"Connection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: s3pPLMBiTxaQ9kYGzzhZRbK+xOo=\r\n"
+            b"\r\n"
+        )
+
+    async def test_handshake_rejects_bad_version(self):
+        """Test that handshakes with an unsupported version are rejected."""
+        writer = MagicMock()
+        headers = {
+            "Upgrade": "websocket",
+            "Connection": "Upgrade",
+            "Sec-WebSocket-Key": "dGhlIHNhbXBsZSBub25jZQ==",
+            "Sec-WebSocket-Version": "8",
+        }
+        req = Request("GET", "/ws", headers, "", {}, {})
+
+        self.assertIsNone(await handle_websocket_handshake(req, writer))
+        writer.write.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()